@@ -0,0 +1,70 @@
+"""
+行情时间戳解析的微基准测试
+
+对比原先的strptime解析方式与TimestampResolver缓存解析方式，
+运行方式（在仓库根目录下）：python -m benchmarks.bench_datetime
+"""
+from datetime import datetime
+from timeit import repeat
+from typing import Callable, List, Tuple
+from zoneinfo import ZoneInfo
+
+from .ctp_stub import install_stubs
+
+install_stubs()
+
+from vnpy_ctpwrapper.gateway.ctp_datetime import TimestampResolver     # noqa: E402
+
+
+CHINA_TZ = ZoneInfo("Asia/Shanghai")
+
+DATE: str = "20240105"
+NUMBER: int = 100_000
+
+
+def make_samples(symbols: int = 2000, seconds: int = 60) -> List[Tuple[str, str, int]]:
+    """生成模拟推送样本：每秒两次（0/500毫秒），每次所有合约推送一遍"""
+    samples: list = []
+    for i in range(seconds):
+        time_str: str = f"09:{i // 60:02d}:{i % 60:02d}"
+        for millisec in (0, 500):
+            samples.extend([(DATE, time_str, millisec)] * symbols)
+    return samples
+
+
+def strptime_resolve(date_str: str, time_str: str, millisec: int) -> datetime:
+    """原先的解析方式"""
+    timestamp: str = f"{date_str} {time_str}.{millisec}"
+    dt: datetime = datetime.strptime(timestamp, "%Y%m%d %H:%M:%S.%f")
+    return dt.replace(tzinfo=CHINA_TZ)
+
+
+def run(name: str, func: Callable, samples: list) -> float:
+    """执行测试并输出单次调用耗时"""
+    n: int = min(NUMBER, len(samples))
+    data: list = samples[:n]
+
+    def loop() -> None:
+        for args in data:
+            func(*args)
+
+    best: float = min(repeat(loop, number=1, repeat=5)) / n
+    print(f"{name:<24}{best * 1e9:>10.0f} ns/call")
+    return best
+
+
+def main() -> None:
+    """主函数"""
+    samples: list = make_samples()
+    resolver: TimestampResolver = TimestampResolver(CHINA_TZ)
+
+    for date_str, time_str, millisec in samples[:1000]:
+        assert resolver.resolve(date_str, time_str, millisec) == strptime_resolve(date_str, time_str, millisec)
+
+    baseline: float = run("strptime", strptime_resolve, samples)
+    cached: float = run("TimestampResolver", resolver.resolve, samples)
+    print(f"speedup: {baseline / cached:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
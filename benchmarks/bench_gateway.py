@@ -0,0 +1,410 @@
+"""
+CTP接口热点路径基准测试
+
+基于ctp_stub中的替身基类运行，无需ctpwrapper二进制和网络连接。
+统计每次调用耗时分位数、吞吐量和内存分配，结果保存为JSON便于版本间对比。
+
+运行方式（在仓库根目录下）：
+    python -m benchmarks.bench_gateway --output result.json
+    python -m benchmarks.bench_gateway --output new.json --compare result.json
+"""
+import json
+import platform
+import subprocess
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter, perf_counter_ns
+from typing import Callable, Dict, List
+
+from .ctp_stub import install_stubs
+
+install_stubs()
+
+from vnpy.trader.constant import Direction, Exchange, Offset, OrderType     # noqa: E402
+from vnpy.trader.object import OrderRequest                                 # noqa: E402
+
+from ctpwrapper.ApiStructure import (                                       # noqa: E402
+    DepthMarketDataField,
+    InstrumentField,
+    InvestorPositionField,
+    OrderField,
+    TradeField,
+)
+from vnpy_ctpwrapper.gateway.ctp_gateway import CtpGateway                  # noqa: E402
+from vnpy_ctpwrapper.gateway.ctp_registry import ContractRegistry           # noqa: E402
+from vnpy_ctpwrapper.gateway.ctp_constant import (                          # noqa: E402
+    THOST_FTDC_PC_Futures,
+    THOST_FTDC_PC_Options,
+    THOST_FTDC_CP_CallOptions,
+    THOST_FTDC_CP_PutOptions,
+    THOST_FTDC_OST_NoTradeQueueing,
+    THOST_FTDC_OPT_LimitPrice,
+    THOST_FTDC_TC_GFD,
+    THOST_FTDC_VC_AV,
+    THOST_FTDC_D_Buy,
+    THOST_FTDC_OF_Open,
+    THOST_FTDC_PD_Long,
+)
+
+
+class NullEventEngine:
+    """丢弃所有事件的事件引擎，避免测量队列本身的开销"""
+
+    def put(self, event) -> None:
+        pass
+
+    def register(self, type: str, handler: Callable) -> None:
+        pass
+
+    def unregister(self, type: str, handler: Callable) -> None:
+        pass
+
+
+def make_instruments(count: int) -> List[InstrumentField]:
+    """生成合约查询回报，大部分为期权，合约代码互不重复"""
+    instruments: list = []
+    futures: int = max(count // 20, 1)
+
+    for i in range(futures):
+        instruments.append(InstrumentField(
+            InstrumentID=f"rb{2401 + i}",
+            ExchangeID="SHFE",
+            InstrumentName=f"螺纹钢{2401 + i}",
+            ProductClass=THOST_FTDC_PC_Futures,
+            ProductID="rb",
+            VolumeMultiple=10,
+            PriceTick=1.0,
+            ExpireDate="20240315",
+        ))
+
+    # 按（标的，看涨看跌，行权价）依次生成，保证每个期权代码唯一
+    for i in range(count - futures):
+        underlying: str = f"rb{2401 + i % futures}"
+        n: int = i // futures
+        call: bool = n % 2 == 0
+        strike: int = 3000 + (n // 2) * 50
+        instruments.append(InstrumentField(
+            InstrumentID=f"{underlying}{'C' if call else 'P'}{strike}",
+            ExchangeID="SHFE",
+            InstrumentName=f"螺纹钢期权{strike}",
+            ProductClass=THOST_FTDC_PC_Options,
+            ProductID="rb_o",
+            VolumeMultiple=10,
+            PriceTick=0.5,
+            UnderlyingInstrID=underlying,
+            OptionsType=THOST_FTDC_CP_CallOptions if call else THOST_FTDC_CP_PutOptions,
+            StrikePrice=strike,
+            OpenDate="20230101",
+            ExpireDate="20240301",
+        ))
+
+    return instruments
+
+
+def make_depths(symbols: List[str], count: int) -> List[DepthMarketDataField]:
+    """生成深度行情推送"""
+    depths: list = []
+    for i in range(count):
+        second: int = i // (2 * len(symbols))
+        price: float = 3500 + i % 17
+        depths.append(DepthMarketDataField(
+            TradingDay="20240105",
+            ActionDay="20240105",
+            UpdateTime=f"{9 + second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}",
+            UpdateMillisec=(i // len(symbols)) % 2 * 500,
+            InstrumentID=symbols[i % len(symbols)],
+            ExchangeID="SHFE",
+            LastPrice=price,
+            PreSettlementPrice=3500.0,
+            PreClosePrice=3500.0,
+            PreOpenInterest=10000.0,
+            OpenPrice=3500.0,
+            HighestPrice=3520.0,
+            LowestPrice=3480.0,
+            Volume=i,
+            Turnover=i * price * 10,
+            OpenInterest=10000.0 + i % 100,
+            ClosePrice=0.0,
+            SettlementPrice=0.0,
+            UpperLimitPrice=3800.0,
+            LowerLimitPrice=3200.0,
+            AveragePrice=35000.0,
+            BidPrice1=price - 1, BidPrice2=price - 2, BidPrice3=price - 3, BidPrice4=price - 4, BidPrice5=price - 5,
+            AskPrice1=price + 1, AskPrice2=price + 2, AskPrice3=price + 3, AskPrice4=price + 4, AskPrice5=price + 5,
+            BidVolume1=10, BidVolume2=20, BidVolume3=30, BidVolume4=40, BidVolume5=50,
+            AskVolume1=11, AskVolume2=21, AskVolume3=31, AskVolume4=41, AskVolume5=51,
+        ))
+    return depths
+
+
+def make_orders(symbols: List[str], count: int) -> List[OrderField]:
+    """生成委托推送，每个委托号只推送一次"""
+    return [
+        OrderField(
+            InstrumentID=symbols[i % len(symbols)],
+            FrontID=1,
+            SessionID=1,
+            OrderRef=str(i),
+            OrderSysID=f"sys{i}",
+            InsertDate="20240105",
+            InsertTime=f"09:{i // 60 % 60:02d}:{i % 60:02d}",
+            OrderPriceType=THOST_FTDC_OPT_LimitPrice,
+            TimeCondition=THOST_FTDC_TC_GFD,
+            VolumeCondition=THOST_FTDC_VC_AV,
+            Direction=THOST_FTDC_D_Buy,
+            CombOffsetFlag=THOST_FTDC_OF_Open,
+            LimitPrice=3500.0,
+            VolumeTotalOriginal=1,
+            VolumeTraded=0,
+            OrderStatus=THOST_FTDC_OST_NoTradeQueueing,
+        )
+        for i in range(count)
+    ]
+
+
+def make_trades(symbols: List[str], count: int) -> List[TradeField]:
+    """生成成交推送，与make_orders生成的委托一一对应"""
+    return [
+        TradeField(
+            InstrumentID=symbols[i % len(symbols)],
+            OrderSysID=f"sys{i}",
+            TradeID=str(i),
+            TradeDate="20240105",
+            TradeTime=f"09:{i // 60 % 60:02d}:{i % 60:02d}",
+            Direction=THOST_FTDC_D_Buy,
+            OffsetFlag=THOST_FTDC_OF_Open,
+            Price=3500.0,
+            Volume=1,
+        )
+        for i in range(count)
+    ]
+
+
+def make_positions(symbols: List[str], count: int) -> List[InvestorPositionField]:
+    """生成持仓查询回报"""
+    return [
+        InvestorPositionField(
+            InstrumentID=symbols[i % len(symbols)],
+            PosiDirection=THOST_FTDC_PD_Long,
+            YdPosition=1,
+            TodayPosition=1,
+            Position=2,
+            PositionProfit=10.0,
+            PositionCost=70000.0,
+            ShortFrozen=0,
+            LongFrozen=0,
+        )
+        for i in range(count)
+    ]
+
+
+def measure(
+    func: Callable,
+    args_list: List[tuple],
+    reset: Callable | None = None,
+    alloc_sample: int = 1000
+) -> Dict[str, float]:
+    """测量调用耗时分位数、吞吐量和内存分配，reset用于在每轮测量前重置状态"""
+    count: int = len(args_list)
+
+    # 逐次计时
+    if reset:
+        reset()
+
+    latencies: list = []
+    for args in args_list:
+        start: int = perf_counter_ns()
+        func(*args)
+        latencies.append(perf_counter_ns() - start)
+
+    # 不计时连续调用，得到吞吐量
+    if reset:
+        reset()
+
+    start_time: float = perf_counter()
+    for args in args_list:
+        func(*args)
+    elapsed: float = perf_counter() - start_time
+
+    # 内存分配（抽样）
+    if reset:
+        reset()
+
+    sample: list = args_list[:alloc_sample]
+    peak_total: int = 0
+
+    tracemalloc.start()
+    start_memory, _ = tracemalloc.get_traced_memory()
+    blocks: int = sys.getallocatedblocks()
+
+    for args in sample:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+        peak_total += peak - before
+
+    blocks = sys.getallocatedblocks() - blocks
+    end_memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+
+    def percentile(p: float) -> int:
+        return latencies[min(int(count * p), count - 1)]
+
+    return {
+        "count": count,
+        "mean_ns": sum(latencies) / count,
+        "p50_ns": percentile(0.50),
+        "p90_ns": percentile(0.90),
+        "p99_ns": percentile(0.99),
+        "p999_ns": percentile(0.999),
+        "max_ns": latencies[-1],
+        "throughput": count / elapsed if elapsed else 0,
+        "alloc_peak_bytes": peak_total / len(sample),
+        "alloc_retained_bytes": (end_memory - start_memory) / len(sample),
+        "alloc_retained_blocks": blocks / len(sample),
+    }
+
+
+def run_benchmarks(contracts: int, number: int) -> Dict[str, dict]:
+    """执行所有基准测试"""
+    gateway: CtpGateway = CtpGateway(NullEventEngine(), "CTP")
+    md_api = gateway.md_api
+    td_api = gateway.td_api
+
+    results: dict = {}
+
+    # 合约查询，每轮测量前清空合约数据，保证每轮都是冷启动加载
+    def reset_contracts() -> None:
+        gateway.set_contract_registry(ContractRegistry())
+        md_api.contexts.clear()
+        td_api.pending_contracts = {}
+        td_api.contract_inited = False
+
+    instruments: list = make_instruments(contracts)
+    last: int = len(instruments) - 1
+    args_list: list = [(data, None, 0, i == last) for i, data in enumerate(instruments)]
+    results["OnRspQryInstrument"] = measure(td_api.OnRspQryInstrument, args_list, reset_contracts)
+
+    # 内存分配测量只加载了部分合约，重新完整加载供后续测试使用
+    reset_contracts()
+    for args in args_list:
+        td_api.OnRspQryInstrument(*args)
+
+    futures: List[str] = [
+        data.InstrumentID for data in instruments
+        if data.ProductClass == THOST_FTDC_PC_Futures
+    ]
+    symbols: List[str] = futures + [data.InstrumentID for data in instruments[len(futures):200]]
+
+    # 行情推送
+    depths: list = make_depths(symbols, number)
+    results["OnRtnDepthMarketData"] = measure(md_api.OnRtnDepthMarketData, [(d,) for d in depths])
+
+    # 委托推送，每轮测量前清空活动委托，保证走相同的处理分支
+    orders: list = make_orders(symbols, number)
+    results["OnRtnOrder"] = measure(
+        td_api.OnRtnOrder, [(o,) for o in orders], td_api.active_orders.clear
+    )
+
+    # 成交推送
+    trades: list = make_trades(symbols, number)
+    for order in orders:
+        td_api.sysid_orderid_map[order.OrderSysID] = f"1_1_{order.OrderRef}"
+    results["OnRtnTrade"] = measure(td_api.OnRtnTrade, [(t,) for t in trades])
+
+    # 持仓查询
+    positions: list = make_positions(symbols, number)
+    args_list = [(p, None, 0, i % 100 == 99) for i, p in enumerate(positions)]
+    results["OnRspQryInvestorPosition"] = measure(td_api.OnRspQryInvestorPosition, args_list)
+
+    # 委托下单
+    reqs: list = [
+        (OrderRequest(
+            symbol=symbols[i % len(symbols)],
+            exchange=Exchange.SHFE,
+            direction=Direction.LONG,
+            type=OrderType.LIMIT,
+            volume=1,
+            price=3500,
+            offset=Offset.OPEN,
+        ),)
+        for i in range(number)
+    ]
+    results["send_order"] = measure(td_api.send_order, reqs)
+
+    return results
+
+
+def get_commit() -> str:
+    """获取当前代码版本"""
+    try:
+        output: bytes = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent,
+            stderr=subprocess.DEVNULL
+        )
+        return output.decode().strip()
+    except Exception:
+        return ""
+
+
+def print_results(results: Dict[str, dict], baseline: Dict[str, dict] | None = None) -> None:
+    """输出结果表格，提供基准结果时附带比值"""
+    header: str = f"{'benchmark':<28}{'p50(ns)':>10}{'p99(ns)':>10}{'p999(ns)':>10}{'calls/s':>12}{'peak B':>10}"
+    if baseline:
+        header += f"{'p50 ratio':>11}{'tput ratio':>11}"
+    print(header)
+
+    for name, r in results.items():
+        line: str = (
+            f"{name:<28}{r['p50_ns']:>10.0f}{r['p99_ns']:>10.0f}{r['p999_ns']:>10.0f}"
+            f"{r['throughput']:>12.0f}{r['alloc_peak_bytes']:>10.0f}"
+        )
+        old: dict | None = baseline.get(name, None) if baseline else None
+        if old:
+            line += f"{r['p50_ns'] / old['p50_ns']:>11.2f}{r['throughput'] / old['throughput']:>11.2f}"
+        print(line)
+
+
+def main() -> None:
+    """主函数"""
+    parser: ArgumentParser = ArgumentParser(description="CTP gateway hot path benchmarks")
+    parser.add_argument("--contracts", type=int, default=12_000, help="合约数量")
+    parser.add_argument("--number", type=int, default=50_000, help="每项测试的调用次数")
+    parser.add_argument("--output", type=str, default="", help="结果JSON文件路径")
+    parser.add_argument("--compare", type=str, default="", help="用于对比的历史结果JSON文件")
+    args = parser.parse_args()
+
+    results: dict = run_benchmarks(args.contracts, args.number)
+
+    baseline: dict | None = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    print_results(results, baseline)
+
+    if args.output:
+        data: dict = {
+            "meta": {
+                "commit": get_commit(),
+                "datetime": datetime.now().isoformat(timespec="seconds"),
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "contracts": args.contracts,
+                "number": args.number,
+            },
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
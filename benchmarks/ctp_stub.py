@@ -0,0 +1,77 @@
+"""
+ctpwrapper的本地替身模块
+
+在导入vnpy_ctpwrapper之前调用install_stubs()，用纯Python的替身替换
+ctpwrapper的结构体和MdApiPy/TraderApiPy基类，使基准测试无需编译好的
+ctpwrapper二进制，也不需要连接CTP服务器。
+"""
+import sys
+from types import ModuleType
+
+
+class StubField:
+    """结构体替身，按关键字参数设置字段"""
+
+    def __init__(self, **kwargs) -> None:
+        self.__dict__.update(kwargs)
+
+
+class StubApi:
+    """API基类替身，所有CTP接口函数（大写开头）直接返回0"""
+
+    def __init__(self) -> None:
+        self.call_count: int = 0
+
+    def __getattr__(self, name: str):
+        if not name[:1].isupper():
+            raise AttributeError(name)
+        return self.stub_call
+
+    def stub_call(self, *args, **kwargs) -> int:
+        self.call_count += 1
+        return 0
+
+
+class MdApiPy(StubApi):
+    pass
+
+
+class TraderApiPy(StubApi):
+    pass
+
+
+FIELD_CLASSES: dict = {}
+
+
+def make_field(name: str) -> type:
+    """按名称生成结构体替身类"""
+    if name.startswith("__"):
+        raise AttributeError(name)
+
+    if name not in FIELD_CLASSES:
+        FIELD_CLASSES[name] = type(name, (StubField,), {})
+    return FIELD_CLASSES[name]
+
+
+def install_stubs() -> None:
+    """将替身模块注册到sys.modules"""
+    package: ModuleType = ModuleType("ctpwrapper")
+    package.__path__ = []
+
+    structure: ModuleType = ModuleType("ctpwrapper.ApiStructure")
+    structure.__getattr__ = make_field
+
+    md: ModuleType = ModuleType("ctpwrapper.Md")
+    md.MdApiPy = MdApiPy
+
+    trader: ModuleType = ModuleType("ctpwrapper.Trader")
+    trader.TraderApiPy = TraderApiPy
+
+    package.ApiStructure = structure
+    package.Md = md
+    package.Trader = trader
+
+    sys.modules["ctpwrapper"] = package
+    sys.modules["ctpwrapper.ApiStructure"] = structure
+    sys.modules["ctpwrapper.Md"] = md
+    sys.modules["ctpwrapper.Trader"] = trader
@@ -0,0 +1,304 @@
+from datetime import datetime, tzinfo
+from typing import Dict, List
+
+import numpy as np
+
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.gateway import BaseGateway
+from vnpy.trader.object import BarData, TickData
+
+
+EVENT_CTP_BAR = "eCtpBar."
+
+# 中国时区相对UTC的分钟偏移，用于N分钟K线按本地时间对齐
+CHINA_OFFSET_MINUTES: int = 8 * 60
+
+
+class BarSlots:
+    """
+    按合约槽位保存的K线状态数组
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """构造函数"""
+        self.open: np.ndarray = np.zeros(capacity)
+        self.high: np.ndarray = np.zeros(capacity)
+        self.low: np.ndarray = np.zeros(capacity)
+        self.close: np.ndarray = np.zeros(capacity)
+        self.volume: np.ndarray = np.zeros(capacity)
+        self.turnover: np.ndarray = np.zeros(capacity)
+        self.open_interest: np.ndarray = np.zeros(capacity)
+
+        # K线起始分钟（1分钟K线）或窗口序号（N分钟K线），-1表示空槽位
+        self.period: np.ndarray = np.full(capacity, -1, dtype=np.int64)
+
+    def resize(self, capacity: int) -> None:
+        """扩容"""
+        for name, array in list(self.__dict__.items()):
+            fill: int = -1 if name == "period" else 0
+            new_array: np.ndarray = np.full(capacity, fill, dtype=array.dtype)
+            new_array[:len(array)] = array
+            setattr(self, name, new_array)
+
+
+class BarAggregator:
+    """
+    网关内部的K线合成器
+
+    所有订阅合约共用一组按槽位组织的数组：每笔Tick只更新对应槽位的
+    1分钟K线状态，成交量和成交额由累计值差分得到。当收到某交易所新一分钟的
+    Tick时，批量结束该交易所所有上一分钟的K线，并合并进N分钟K线，
+    以事件EVENT_CTP_BAR + 周期分钟数批量推送K线列表。
+
+    各交易所的时钟独立推进，避免一个交易所的时间提前结束其他交易所的K线。
+    已经结束的分钟不会重新打开，迟到的Tick成交量计入仍未结束的N分钟K线，
+    并由late_count计数。
+    """
+
+    def __init__(
+        self,
+        gateway: BaseGateway,
+        tz: tzinfo,
+        windows: List[int] | None = None,
+        capacity: int = 1024
+    ) -> None:
+        """构造函数"""
+        self.gateway: BaseGateway = gateway
+        self.gateway_name: str = gateway.gateway_name
+        self.tz: tzinfo = tz
+        self.windows: List[int] = [w for w in (windows or []) if w > 1]
+
+        self.capacity: int = capacity
+        self.slot_map: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        self.exchanges: List[Exchange] = []
+
+        # 槽位所属交易所的编码，以及最近结束的1分钟K线起始分钟
+        self.exchange_codes: Dict[Exchange, int] = {}
+        self.slot_exchanges: np.ndarray = np.zeros(capacity, dtype=np.int64)
+        self.finished: np.ndarray = np.full(capacity, -1, dtype=np.int64)
+
+        self.last_volume: List[float] = []
+        self.last_turnover: List[float] = []
+
+        self.bars: BarSlots = BarSlots(capacity)
+        self.window_bars: Dict[int, BarSlots] = {w: BarSlots(capacity) for w in self.windows}
+
+        # 各交易所当前的分钟
+        self.exchange_minutes: Dict[Exchange, int] = {}
+        self.late_count: int = 0
+
+    def add_slot(self, tick: TickData) -> int:
+        """为新合约分配槽位"""
+        slot: int = len(self.symbols)
+        if slot >= self.capacity:
+            self.capacity *= 2
+            self.bars.resize(self.capacity)
+            for bars in self.window_bars.values():
+                bars.resize(self.capacity)
+
+            self.slot_exchanges = np.resize(self.slot_exchanges, self.capacity)
+            finished: np.ndarray = np.full(self.capacity, -1, dtype=np.int64)
+            finished[:slot] = self.finished[:slot]
+            self.finished = finished
+
+        self.slot_map[tick.symbol] = slot
+        self.symbols.append(tick.symbol)
+        self.exchanges.append(tick.exchange)
+        self.slot_exchanges[slot] = self.exchange_codes.setdefault(tick.exchange, len(self.exchange_codes))
+        self.last_volume.append(-1)
+        self.last_turnover.append(0)
+        return slot
+
+    def update_tick(self, tick: TickData) -> None:
+        """更新Tick数据"""
+        if not tick.last_price:
+            return
+
+        slot: int | None = self.slot_map.get(tick.symbol, None)
+        if slot is None:
+            slot = self.add_slot(tick)
+
+        minute: int = int(tick.datetime.timestamp()) // 60
+        current_minute: int = self.exchange_minutes.get(tick.exchange, -1)
+        if minute > current_minute:
+            if current_minute >= 0:
+                self.roll(minute, tick.exchange)
+            self.exchange_minutes[tick.exchange] = minute
+
+        # 累计成交量差分，首笔Tick及交易日切换时不计入
+        last_volume: float = self.last_volume[slot]
+        if last_volume >= 0:
+            volume_change: float = max(tick.volume - last_volume, 0)
+            turnover_change: float = max(tick.turnover - self.last_turnover[slot], 0)
+        else:
+            volume_change = turnover_change = 0
+        self.last_volume[slot] = tick.volume
+        self.last_turnover[slot] = tick.turnover
+
+        bars: BarSlots = self.bars
+        price: float = tick.last_price
+        period: int = bars.period[slot]
+
+        if period != minute:
+            # 乱序到达的上一分钟Tick只累计成交量
+            if period > minute:
+                bars.volume[slot] += volume_change
+                bars.turnover[slot] += turnover_change
+                return
+
+            # 所属分钟已经结束，不再重新打开
+            if minute <= self.finished[slot]:
+                self.fold_late(slot, minute, volume_change, turnover_change)
+                return
+
+            bars.period[slot] = minute
+            bars.open[slot] = bars.high[slot] = bars.low[slot] = price
+            bars.volume[slot] = volume_change
+            bars.turnover[slot] = turnover_change
+        else:
+            if price > bars.high[slot]:
+                bars.high[slot] = price
+            elif price < bars.low[slot]:
+                bars.low[slot] = price
+            bars.volume[slot] += volume_change
+            bars.turnover[slot] += turnover_change
+
+        bars.close[slot] = price
+        bars.open_interest[slot] = tick.open_interest
+
+    def fold_late(self, slot: int, minute: int, volume_change: float, turnover_change: float) -> None:
+        """迟到Tick的成交量计入仍未结束的N分钟K线"""
+        self.late_count += 1
+
+        for window, window_bars in self.window_bars.items():
+            if window_bars.period[slot] == (minute + CHINA_OFFSET_MINUTES) // window:
+                window_bars.volume[slot] += volume_change
+                window_bars.turnover[slot] += turnover_change
+
+    def roll(self, minute: int, exchange: Exchange | None = None) -> None:
+        """结束交易所minute之前的所有K线并批量推送，exchange为None时处理所有合约"""
+        n: int = len(self.symbols)
+        bars: BarSlots = self.bars
+
+        if exchange:
+            scope: np.ndarray = self.slot_exchanges[:n] == self.exchange_codes[exchange]
+        else:
+            scope = np.ones(n, dtype=bool)
+
+        period: np.ndarray = bars.period[:n]
+        index: np.ndarray = np.nonzero(scope & (period >= 0) & (period < minute))[0]
+        if len(index):
+            self.gateway.on_event(EVENT_CTP_BAR + "1", self.generate_bars(bars, index, 1))
+
+        for window, window_bars in self.window_bars.items():
+            self.update_window(window, window_bars, index, minute, scope)
+
+        self.finished[index] = bars.period[index]
+        bars.period[index] = -1
+
+    def update_window(
+        self,
+        window: int,
+        window_bars: BarSlots,
+        index: np.ndarray,
+        minute: int,
+        scope: np.ndarray
+    ) -> None:
+        """将完成的1分钟K线合并进N分钟K线"""
+        bars: BarSlots = self.bars
+        finished: List[BarData] = []
+
+        if len(index):
+            bucket: np.ndarray = (bars.period[index] + CHINA_OFFSET_MINUTES) // window
+
+            # 已有的窗口K线属于更早的窗口，先行结束
+            current: np.ndarray = window_bars.period[index]
+            stale: np.ndarray = index[(current >= 0) & (current != bucket)]
+            if len(stale):
+                finished.extend(self.generate_bars(window_bars, stale, window))
+                window_bars.period[stale] = -1
+
+            empty: np.ndarray = window_bars.period[index] < 0
+            new: np.ndarray = index[empty]
+            window_bars.period[new] = bucket[empty]
+            window_bars.open[new] = bars.open[new]
+            window_bars.high[new] = bars.high[new]
+            window_bars.low[new] = bars.low[new]
+            window_bars.volume[new] = 0
+            window_bars.turnover[new] = 0
+
+            window_bars.high[index] = np.maximum(window_bars.high[index], bars.high[index])
+            window_bars.low[index] = np.minimum(window_bars.low[index], bars.low[index])
+            window_bars.close[index] = bars.close[index]
+            window_bars.volume[index] += bars.volume[index]
+            window_bars.turnover[index] += bars.turnover[index]
+            window_bars.open_interest[index] = bars.open_interest[index]
+
+        # 窗口时间已经结束的K线
+        n: int = len(self.symbols)
+        period: np.ndarray = window_bars.period[:n]
+        current_bucket: int = (minute + CHINA_OFFSET_MINUTES) // window
+        done: np.ndarray = np.nonzero(scope & (period >= 0) & (period < current_bucket))[0]
+        if len(done):
+            finished.extend(self.generate_bars(window_bars, done, window))
+            window_bars.period[done] = -1
+
+        if finished:
+            self.gateway.on_event(EVENT_CTP_BAR + str(window), finished)
+
+    def generate_bars(self, bars: BarSlots, index: np.ndarray, window: int) -> List[BarData]:
+        """由槽位数组生成K线对象"""
+        if window == 1:
+            minutes: list = bars.period[index].tolist()
+        else:
+            minutes: list = (bars.period[index] * window - CHINA_OFFSET_MINUTES).tolist()
+
+        dt_cache: Dict[int, datetime] = {}
+        result: List[BarData] = []
+
+        for slot, minute, open_price, high_price, low_price, close_price, volume, turnover, open_interest in zip(
+            index.tolist(),
+            minutes,
+            bars.open[index].tolist(),
+            bars.high[index].tolist(),
+            bars.low[index].tolist(),
+            bars.close[index].tolist(),
+            bars.volume[index].tolist(),
+            bars.turnover[index].tolist(),
+            bars.open_interest[index].tolist(),
+        ):
+            dt: datetime | None = dt_cache.get(minute, None)
+            if not dt:
+                dt = datetime.fromtimestamp(minute * 60, self.tz)
+                dt_cache[minute] = dt
+
+            result.append(BarData(
+                symbol=self.symbols[slot],
+                exchange=self.exchanges[slot],
+                datetime=dt,
+                interval=Interval.MINUTE,
+                volume=volume,
+                turnover=turnover,
+                open_interest=open_interest,
+                open_price=open_price,
+                high_price=high_price,
+                low_price=low_price,
+                close_price=close_price,
+                gateway_name=self.gateway_name
+            ))
+
+        return result
+
+    def flush(self) -> None:
+        """强制结束并推送所有未完成的K线"""
+        if not self.exchange_minutes:
+            return
+
+        self.roll(max(self.exchange_minutes.values()) + 1)
+        for window, window_bars in self.window_bars.items():
+            n: int = len(self.symbols)
+            index: np.ndarray = np.nonzero(window_bars.period[:n] >= 0)[0]
+            if len(index):
+                self.gateway.on_event(EVENT_CTP_BAR + str(window), self.generate_bars(window_bars, index, window))
+                window_bars.period[index] = -1
@@ -0,0 +1,46 @@
+from typing import List
+
+from vnpy.trader.gateway import BaseGateway
+from vnpy.trader.object import ContractData
+
+
+EVENT_CTP_CONTRACTS = "eCtpContracts"
+
+
+class ContractBatcher:
+    """
+    合约批量推送
+
+    合约查询回报期间先收集合约，在查询结束时或达到批次大小时，
+    以事件EVENT_CTP_CONTRACTS推送合约列表，避免登录时逐个合约推送
+    大量事件。per_contract为True时仍同时推送逐个合约的事件。
+    """
+
+    def __init__(self, gateway: BaseGateway, chunk_size: int = 0, per_contract: bool = False) -> None:
+        """构造函数，chunk_size为0时只在查询结束时推送"""
+        self.gateway: BaseGateway = gateway
+        self.chunk_size: int = chunk_size
+        self.per_contract: bool = per_contract
+
+        self.contracts: List[ContractData] = []
+        self.batch_count: int = 0
+
+    def put(self, contract: ContractData) -> None:
+        """收集合约"""
+        if self.per_contract:
+            self.gateway.on_contract(contract)
+
+        self.contracts.append(contract)
+        if self.chunk_size and len(self.contracts) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """推送已收集的合约"""
+        if not self.contracts:
+            return
+
+        contracts: List[ContractData] = self.contracts
+        self.contracts = []
+
+        self.gateway.on_event(EVENT_CTP_CONTRACTS, contracts)
+        self.batch_count += 1
@@ -0,0 +1,237 @@
+import os
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from struct import Struct
+from time import sleep, time_ns
+from typing import Dict, List
+
+from .ctp_record import RECORD_SIZE, DepthSnapshot, pack_depth_into, unpack_depth_from
+from .ctp_recorder import HEADER_SIZE, HEADER_STRUCT
+
+
+BOARD_MAGIC: bytes = b"CTPBOARD"
+BOARD_VERSION: int = 1
+
+# 每个槽位：版本号 + 深度行情记录，版本号为奇数时表示正在写入
+SEQ_STRUCT: Struct = Struct("<Q")
+SLOT_SIZE: int = SEQ_STRUCT.size + RECORD_SIZE
+
+# 读取时遇到写入中的槽位，最多重试的次数
+MAX_RETRIES: int = 1000
+
+# 文件头中写入方进程号的位置
+OWNER_STRUCT: Struct = Struct("<Q")
+OWNER_OFFSET: int = HEADER_STRUCT.size
+
+
+def is_process_alive(pid: int) -> bool:
+    """检查进程是否仍在运行"""
+    if not pid:
+        return False
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def create_shared_memory(name: str, size: int) -> SharedMemory:
+    """创建共享内存，清零全部内容并在文件头记录本进程号"""
+    try:
+        shm: SharedMemory = SharedMemory(name, create=True, size=size)
+    except FileExistsError:
+        old: SharedMemory = SharedMemory(name)
+        pid: int = 0
+        if old.size >= OWNER_OFFSET + OWNER_STRUCT.size:
+            pid = OWNER_STRUCT.unpack_from(old.buf, OWNER_OFFSET)[0]
+        old.close()
+
+        # 写入方仍在运行时不能删除，否则其读取方会停留在失效的共享内存上
+        if is_process_alive(pid):
+            # 连接时登记到了资源跟踪器，取消登记避免本进程退出时将其删除
+            if pid != os.getpid():
+                resource_tracker.unregister(old._name, "shared_memory")
+            raise FileExistsError(f"共享内存{name}正在被进程{pid}使用")
+
+        # 上次异常退出残留的共享内存，清理后重新创建
+        old.unlink()
+        shm = SharedMemory(name, create=True, size=size)
+
+    shm.buf[:size] = bytes(size)
+    OWNER_STRUCT.pack_into(shm.buf, OWNER_OFFSET, os.getpid())
+    return shm
+
+
+def remove_shared_memory(shm: SharedMemory) -> None:
+    """关闭并删除共享内存，已被删除时忽略"""
+    shm.close()
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def attach_shared_memory(name: str) -> SharedMemory:
+    """只读方连接已有的共享内存"""
+    shm: SharedMemory = SharedMemory(name)
+
+    # 只读方不负责删除共享内存，避免进程退出时被资源跟踪器清理，
+    # 与写入方在同一进程时登记属于写入方，不能取消
+    pid: int = OWNER_STRUCT.unpack_from(shm.buf, OWNER_OFFSET)[0]
+    if pid != os.getpid():
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+def get_slot_offset(slot: int) -> int:
+    """计算槽位在共享内存中的偏移"""
+    return HEADER_SIZE + slot * SLOT_SIZE
+
+
+class SnapshotBoard:
+    """
+    共享内存最新行情快照板
+
+    在一块固定布局的共享内存中为每个合约分配一个槽位，保存最新的
+    深度行情。写入时先将槽位版本号加一（奇数），写完记录后再加一（偶数），
+    读取方比较读取前后的版本号即可判断是否读到完整数据，无需加锁。
+    槽位按合约首次出现的顺序分配，分配后不再改变，文件头记录已分配数量。
+    文件头同时记录写入方进程号，同名快照板的写入方仍在运行时创建失败。
+    """
+
+    def __init__(self, name: str, capacity: int = 4096) -> None:
+        """构造函数"""
+        self.name: str = name
+        self.capacity: int = capacity
+
+        self.shm: SharedMemory = create_shared_memory(name, HEADER_SIZE + capacity * SLOT_SIZE)
+        self.buffer: memoryview = self.shm.buf
+
+        self.slots: Dict[str, int] = {}
+        self.sequences: List[int] = [0] * capacity
+        self.count: int = 0
+        self.overflows: int = 0
+
+        self.write_header()
+
+    def write_header(self) -> None:
+        """更新文件头"""
+        HEADER_STRUCT.pack_into(
+            self.buffer, 0, BOARD_MAGIC, BOARD_VERSION, SLOT_SIZE, self.capacity, self.count
+        )
+
+    def update(self, data: object) -> None:
+        """写入合约的最新深度行情"""
+        symbol: str = data.InstrumentID
+
+        slot: int | None = self.slots.get(symbol, None)
+        new: bool = slot is None
+        if new:
+            if self.count >= self.capacity:
+                self.overflows += 1
+                return
+            slot = self.count
+            self.slots[symbol] = slot
+
+        offset: int = get_slot_offset(slot)
+        seq: int = self.sequences[slot]
+
+        SEQ_STRUCT.pack_into(self.buffer, offset, seq + 1)
+        pack_depth_into(self.buffer, offset + SEQ_STRUCT.size, data, time_ns())
+        SEQ_STRUCT.pack_into(self.buffer, offset, seq + 2)
+        self.sequences[slot] = seq + 2
+
+        # 记录写完后再公开新槽位
+        if new:
+            self.count += 1
+            self.write_header()
+
+    def get_statistics(self) -> Dict[str, int]:
+        """查询槽位使用情况"""
+        return {
+            "capacity": self.capacity,
+            "symbols": self.count,
+            "overflows": self.overflows,
+        }
+
+    def close(self) -> None:
+        """关闭并删除共享内存"""
+        self.buffer.release()
+        remove_shared_memory(self.shm)
+
+
+class SnapshotReader:
+    """
+    共享内存最新行情快照读取
+
+    供其他进程使用，按合约代码读取快照板中的最新深度行情。
+    """
+
+    def __init__(self, name: str) -> None:
+        """构造函数"""
+        self.shm: SharedMemory = attach_shared_memory(name)
+        self.buffer: memoryview = self.shm.buf
+
+        magic, _, slot_size, capacity, _ = HEADER_STRUCT.unpack_from(self.buffer, 0)
+        if magic != BOARD_MAGIC or slot_size != SLOT_SIZE:
+            self.close()
+            raise ValueError(f"行情快照板格式不匹配：{name}")
+
+        self.capacity: int = capacity
+        self.slots: Dict[str, int] = {}
+        self.count: int = 0
+
+    def refresh(self) -> None:
+        """加载新分配的槽位"""
+        count: int = HEADER_STRUCT.unpack_from(self.buffer, 0)[-1]
+
+        while self.count < count:
+            snapshot: DepthSnapshot | None = self.read_slot(self.count)
+            if not snapshot:
+                break
+
+            self.slots[snapshot.InstrumentID] = self.count
+            self.count += 1
+
+    def read_slot(self, slot: int) -> DepthSnapshot | None:
+        """读取槽位，版本号前后一致时返回快照"""
+        offset: int = get_slot_offset(slot)
+
+        for _ in range(MAX_RETRIES):
+            seq: int = SEQ_STRUCT.unpack_from(self.buffer, offset)[0]
+            if seq & 1:
+                # 让出CPU等待写入完成
+                sleep(0)
+                continue
+
+            snapshot: DepthSnapshot = unpack_depth_from(self.buffer, offset + SEQ_STRUCT.size)
+            if SEQ_STRUCT.unpack_from(self.buffer, offset)[0] == seq:
+                return snapshot
+
+        return None
+
+    def get(self, symbol: str) -> DepthSnapshot | None:
+        """读取合约的最新深度行情"""
+        slot: int | None = self.slots.get(symbol, None)
+        if slot is None:
+            self.refresh()
+            slot = self.slots.get(symbol, None)
+            if slot is None:
+                return None
+
+        return self.read_slot(slot)
+
+    def get_symbols(self) -> List[str]:
+        """查询快照板中的所有合约"""
+        self.refresh()
+        return list(self.slots)
+
+    def close(self) -> None:
+        """断开共享内存"""
+        self.buffer.release()
+        self.shm.close()
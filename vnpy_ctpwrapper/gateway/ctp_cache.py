@@ -0,0 +1,120 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from vnpy.trader.constant import Exchange, OptionType, Product
+from vnpy.trader.object import ContractData
+
+
+# 每个交易日一个缓存文件，保留最近的文件数量
+KEEP_DAYS: int = 5
+
+DATE_FORMAT: str = "%Y%m%d"
+
+
+class ContractCache:
+    """
+    按交易日保存的合约缓存
+
+    合约查询完成后，将合约信息按列保存为npz文件，同一交易日内重启时
+    可以直接加载，无需等待全量合约查询回报。
+    """
+
+    def __init__(self, folder: Path) -> None:
+        """构造函数"""
+        self.folder: Path = folder
+
+    def get_path(self, trading_day: str) -> Path:
+        """获取交易日对应的缓存文件路径"""
+        return self.folder.joinpath(f"{trading_day}.npz")
+
+    def save(self, trading_day: str, contracts: List[Tuple[ContractData, str, str]]) -> None:
+        """保存合约，每个元素为（合约，品种代码，到期日）"""
+        self.folder.mkdir(parents=True, exist_ok=True)
+
+        columns: Dict[str, list] = {
+            "symbol": [],
+            "exchange": [],
+            "name": [],
+            "product": [],
+            "size": [],
+            "pricetick": [],
+            "product_id": [],
+            "expiry": [],
+            "option_portfolio": [],
+            "option_underlying": [],
+            "option_type": [],
+            "option_strike": [],
+            "option_listed": [],
+            "option_expiry": [],
+        }
+
+        for contract, product_id, expiry in contracts:
+            option: bool = contract.product == Product.OPTION
+
+            columns["symbol"].append(contract.symbol)
+            columns["exchange"].append(contract.exchange.value)
+            columns["name"].append(contract.name)
+            columns["product"].append(contract.product.value)
+            columns["size"].append(contract.size)
+            columns["pricetick"].append(contract.pricetick)
+            columns["product_id"].append(product_id)
+            columns["expiry"].append(expiry)
+            columns["option_portfolio"].append(contract.option_portfolio if option else "")
+            columns["option_underlying"].append(contract.option_underlying if option else "")
+            columns["option_type"].append(contract.option_type.value if option and contract.option_type else "")
+            columns["option_strike"].append(contract.option_strike if option else 0)
+            columns["option_listed"].append(contract.option_listed.strftime(DATE_FORMAT) if option else "")
+            columns["option_expiry"].append(contract.option_expiry.strftime(DATE_FORMAT) if option else "")
+
+        # 先写临时文件再替换，避免异常退出时留下不完整的缓存
+        path: Path = self.get_path(trading_day)
+        temp_path: Path = path.with_suffix(".tmp.npz")
+        np.savez(temp_path, **{key: np.array(values) for key, values in columns.items()})
+        temp_path.replace(path)
+
+        self.clean()
+
+    def load(self, trading_day: str, gateway_name: str) -> List[Tuple[ContractData, str, str]]:
+        """加载合约，交易日没有缓存时返回空列表"""
+        path: Path = self.get_path(trading_day)
+        if not path.exists():
+            return []
+
+        with np.load(path) as data:
+            columns: Dict[str, list] = {key: data[key].tolist() for key in data.files}
+
+        result: List[Tuple[ContractData, str, str]] = []
+        option_types: Dict[str, OptionType] = {t.value: t for t in OptionType}
+
+        for i, symbol in enumerate(columns["symbol"]):
+            contract: ContractData = ContractData(
+                symbol=symbol,
+                exchange=Exchange(columns["exchange"][i]),
+                name=columns["name"][i],
+                product=Product(columns["product"][i]),
+                size=columns["size"][i],
+                pricetick=columns["pricetick"][i],
+                gateway_name=gateway_name
+            )
+
+            if contract.product == Product.OPTION:
+                contract.option_portfolio = columns["option_portfolio"][i]
+                contract.option_underlying = columns["option_underlying"][i]
+                contract.option_type = option_types.get(columns["option_type"][i], None)
+                contract.option_strike = columns["option_strike"][i]
+                contract.option_index = str(contract.option_strike)
+                contract.option_listed = datetime.strptime(columns["option_listed"][i], DATE_FORMAT)
+                contract.option_expiry = datetime.strptime(columns["option_expiry"][i], DATE_FORMAT)
+
+            result.append((contract, columns["product_id"][i], columns["expiry"][i]))
+
+        return result
+
+    def clean(self) -> None:
+        """删除较早交易日的缓存文件"""
+        paths: List[Path] = sorted(self.folder.glob("*.npz"))
+        for path in paths[:-KEEP_DAYS]:
+            path.unlink()
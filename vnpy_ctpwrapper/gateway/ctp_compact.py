@@ -0,0 +1,294 @@
+import sys
+from array import array
+from datetime import datetime
+from threading import Lock
+from typing import Dict, List
+
+from vnpy.trader.constant import Exchange, OptionType, Product
+from vnpy.trader.object import ContractData
+
+
+EXCHANGES: List[Exchange] = list(Exchange)
+PRODUCTS: List[Product] = list(Product)
+OPTION_TYPES: List[OptionType | None] = [None] + list(OptionType)
+
+EXCHANGE_CODES: Dict[Exchange, int] = {exchange: i for i, exchange in enumerate(EXCHANGES)}
+PRODUCT_CODES: Dict[Product, int] = {product: i for i, product in enumerate(PRODUCTS)}
+OPTION_TYPE_CODES: Dict[OptionType | None, int] = {option_type: i for i, option_type in enumerate(OPTION_TYPES)}
+
+
+def to_date_int(dt: datetime | None) -> int:
+    """日期转为YYYYMMDD整数，空值为0"""
+    if not dt:
+        return 0
+    return dt.year * 10000 + dt.month * 100 + dt.day
+
+
+def from_date_int(value: int) -> datetime | None:
+    """YYYYMMDD整数转为日期"""
+    if not value:
+        return None
+    return datetime(value // 10000, value // 100 % 100, value % 100)
+
+
+class ContractView:
+    """
+    紧凑合约存储中单个合约的只读视图
+
+    只保存存储对象和行号，属性与ContractData保持一致，
+    访问时从对应的列中读取。
+    """
+
+    __slots__ = ("store", "index")
+
+    # CTP合约固定不变的字段
+    min_volume: float = 1
+    max_volume: float | None = None
+    stop_supported: bool = False
+    net_position: bool = False
+    history_data: bool = False
+    extra: dict | None = None
+
+    def __init__(self, store: "CompactContractStore", index: int) -> None:
+        """构造函数"""
+        self.store: CompactContractStore = store
+        self.index: int = index
+
+    @property
+    def symbol(self) -> str:
+        return self.store.symbols[self.index]
+
+    @property
+    def exchange(self) -> Exchange:
+        return EXCHANGES[self.store.exchanges[self.index]]
+
+    @property
+    def vt_symbol(self) -> str:
+        return f"{self.symbol}.{self.exchange.value}"
+
+    @property
+    def name(self) -> str:
+        return self.store.names[self.index]
+
+    @property
+    def product(self) -> Product:
+        return PRODUCTS[self.store.products[self.index]]
+
+    @property
+    def size(self) -> float:
+        return self.store.sizes[self.index]
+
+    @property
+    def pricetick(self) -> float:
+        return self.store.priceticks[self.index]
+
+    @property
+    def gateway_name(self) -> str:
+        return self.store.gateway_name
+
+    @property
+    def option_strike(self) -> float | None:
+        if not self.is_option():
+            return None
+        return self.store.strikes[self.index]
+
+    @property
+    def option_underlying(self) -> str | None:
+        if not self.is_option():
+            return None
+        return self.store.underlyings[self.index]
+
+    @property
+    def option_type(self) -> OptionType | None:
+        return OPTION_TYPES[self.store.option_types[self.index]]
+
+    @property
+    def option_listed(self) -> datetime | None:
+        return from_date_int(self.store.listed_dates[self.index])
+
+    @property
+    def option_expiry(self) -> datetime | None:
+        return from_date_int(self.store.expiry_dates[self.index])
+
+    @property
+    def option_portfolio(self) -> str | None:
+        if not self.is_option():
+            return None
+        return self.store.portfolios[self.index]
+
+    @property
+    def option_index(self) -> str | None:
+        if not self.is_option():
+            return None
+        return str(self.store.strikes[self.index])
+
+    def is_option(self) -> bool:
+        """是否为期权合约"""
+        return self.store.products[self.index] == PRODUCT_CODES[Product.OPTION]
+
+    def to_contract(self) -> ContractData:
+        """生成完整的ContractData对象"""
+        return self.store.to_contract(self.index)
+
+
+class CompactContractStore:
+    """
+    紧凑合约存储
+
+    按列保存合约信息：数值字段保存在array中，枚举字段保存为编码，
+    字符串字段经过驻留后共享同一对象，每个合约只额外占用一个视图对象。
+    已有的行写入后不再修改，合约信息变化时追加新行并返回新视图，
+    之前发出的视图保持原值，与合约注册表的写时复制保持一致。
+    """
+
+    def __init__(self, gateway_name: str) -> None:
+        """构造函数"""
+        self.gateway_name: str = gateway_name
+        self.lock: Lock = Lock()
+
+        self.rows: Dict[str, int] = {}
+        self.views: List[ContractView] = []
+
+        self.symbols: List[str] = []
+        self.names: List[str] = []
+        self.underlyings: List[str] = []
+        self.portfolios: List[str] = []
+
+        self.exchanges: array = array("B")
+        self.products: array = array("B")
+        self.option_types: array = array("B")
+        self.sizes: array = array("d")
+        self.priceticks: array = array("d")
+        self.strikes: array = array("d")
+        self.listed_dates: array = array("i")
+        self.expiry_dates: array = array("i")
+
+    def add(self, contract: ContractData) -> ContractView:
+        """添加或更新合约，返回对应的视图"""
+        values: tuple = (
+            sys.intern(contract.name),
+            sys.intern(contract.option_underlying or ""),
+            sys.intern(contract.option_portfolio or ""),
+            EXCHANGE_CODES[contract.exchange],
+            PRODUCT_CODES[contract.product],
+            OPTION_TYPE_CODES[contract.option_type],
+            contract.size,
+            contract.pricetick,
+            contract.option_strike or 0,
+            to_date_int(contract.option_listed),
+            to_date_int(contract.option_expiry),
+        )
+
+        with self.lock:
+            # 合约信息没有变化时沿用已有的行
+            index: int | None = self.rows.get(contract.symbol, None)
+            if index is not None and self.get_values(index) == values:
+                return self.views[index]
+
+            index = len(self.symbols)
+            self.rows[contract.symbol] = index
+            self.views.append(ContractView(self, index))
+
+            self.symbols.append(sys.intern(contract.symbol))
+            for column, value in zip(self.get_columns(), values):
+                column.append(value)
+
+            return self.views[index]
+
+    def get_values(self, index: int) -> tuple:
+        """读取指定行除合约代码外的所有字段"""
+        return tuple(column[index] for column in self.get_columns())
+
+    def get_columns(self) -> list:
+        """除合约代码外的所有列，顺序与add中的values一致"""
+        return [
+            self.names,
+            self.underlyings,
+            self.portfolios,
+            self.exchanges,
+            self.products,
+            self.option_types,
+            self.sizes,
+            self.priceticks,
+            self.strikes,
+            self.listed_dates,
+            self.expiry_dates,
+        ]
+
+    def get(self, symbol: str) -> ContractView | None:
+        """查询合约视图"""
+        index: int | None = self.rows.get(symbol, None)
+        if index is None:
+            return None
+        return self.views[index]
+
+    def to_contract(self, index: int) -> ContractData:
+        """由指定行生成完整的ContractData对象"""
+        view: ContractView = self.views[index]
+
+        contract: ContractData = ContractData(
+            symbol=view.symbol,
+            exchange=view.exchange,
+            name=view.name,
+            product=view.product,
+            size=view.size,
+            pricetick=view.pricetick,
+            gateway_name=self.gateway_name
+        )
+
+        if view.is_option():
+            contract.option_portfolio = view.option_portfolio
+            contract.option_underlying = view.option_underlying
+            contract.option_type = view.option_type
+            contract.option_strike = view.option_strike
+            contract.option_index = view.option_index
+            contract.option_listed = view.option_listed
+            contract.option_expiry = view.option_expiry
+
+        return contract
+
+    def get_memory_usage(self) -> Dict[str, int]:
+        """统计存储占用的内存字节数，包括合约更新后保留的旧行"""
+        count: int = len(self.rows)
+
+        arrays: int = sum(
+            sys.getsizeof(column) for column in self.get_columns() if isinstance(column, array)
+        )
+
+        lists: int = sys.getsizeof(self.symbols) + sys.getsizeof(self.views) + sum(
+            sys.getsizeof(column) for column in self.get_columns() if isinstance(column, list)
+        )
+
+        # 驻留后的字符串按对象去重计算
+        strings: Dict[int, str] = {}
+        for column in (self.symbols, self.names, self.underlyings, self.portfolios):
+            for s in column:
+                strings[id(s)] = s
+        string_bytes: int = sum(sys.getsizeof(s) for s in strings.values())
+
+        views: int = sum(sys.getsizeof(view) for view in self.views)
+        rows: int = sys.getsizeof(self.rows)
+
+        total: int = arrays + lists + string_bytes + views + rows
+        return {
+            "contracts": count,
+            "rows": len(self.symbols),
+            "arrays": arrays,
+            "lists": lists,
+            "strings": string_bytes,
+            "views": views,
+            "index": rows,
+            "total": total,
+            "per_contract": total // count if count else 0,
+        }
+
+
+def estimate_contract_size(contract: ContractData) -> int:
+    """估算单个ContractData对象及其独有字段占用的内存字节数"""
+    size: int = sys.getsizeof(contract) + sys.getsizeof(contract.__dict__)
+
+    for value in contract.__dict__.values():
+        if isinstance(value, (str, float, datetime)):
+            size += sys.getsizeof(value)
+
+    return size
@@ -0,0 +1,83 @@
+from collections import defaultdict
+from threading import Lock
+from typing import Dict
+
+from vnpy.event import Event, EventEngine
+from vnpy.trader.gateway import BaseGateway
+from vnpy.trader.object import TickData
+
+
+EVENT_CTP_CONFLATION = "eCtpConflation."
+
+
+class TickConflator:
+    """
+    Tick行情合并器
+
+    每个合约只保留最新一笔待推送的Tick，事件队列中始终最多只有一个
+    合并推送事件。当事件引擎处理到该事件时（即之前的事件均已被消费），
+    再将所有合约的最新快照一次性推送出去。
+    """
+
+    def __init__(self, gateway: BaseGateway) -> None:
+        """构造函数"""
+        self.gateway: BaseGateway = gateway
+        self.event_engine: EventEngine = gateway.event_engine
+        self.event_type: str = EVENT_CTP_CONFLATION + gateway.gateway_name
+
+        self.lock: Lock = Lock()
+        self.pending: Dict[str, TickData] = {}
+        self.scheduled: bool = False
+        self.active: bool = False
+
+        self.conflated: Dict[str, int] = defaultdict(int)
+
+    def start(self) -> None:
+        """启动"""
+        if self.active:
+            return
+        self.active = True
+        self.event_engine.register(self.event_type, self.process_conflation_event)
+
+    def stop(self) -> None:
+        """停止，并推送剩余的Tick"""
+        if not self.active:
+            return
+        self.active = False
+        self.event_engine.unregister(self.event_type, self.process_conflation_event)
+        self.flush()
+
+    def put(self, tick: TickData) -> None:
+        """放入最新Tick"""
+        with self.lock:
+            if tick.symbol in self.pending:
+                self.conflated[tick.symbol] += 1
+            self.pending[tick.symbol] = tick
+
+            if self.scheduled:
+                return
+            self.scheduled = True
+
+        self.event_engine.put(Event(self.event_type))
+
+    def flush(self) -> None:
+        """推送所有待处理的Tick"""
+        with self.lock:
+            pending: Dict[str, TickData] = self.pending
+            self.pending = {}
+            self.scheduled = False
+
+        for tick in pending.values():
+            self.gateway.on_tick(tick)
+
+    def process_conflation_event(self, event: Event) -> None:
+        """处理合并推送事件"""
+        self.flush()
+
+    def get_conflated_count(self, symbol: str) -> int:
+        """查询合约被合并丢弃的Tick数量"""
+        return self.conflated.get(symbol, 0)
+
+    def get_conflated_counts(self) -> Dict[str, int]:
+        """查询所有合约被合并丢弃的Tick数量"""
+        return dict(self.conflated)
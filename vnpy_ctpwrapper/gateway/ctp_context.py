@@ -0,0 +1,42 @@
+from vnpy.trader.constant import Exchange
+from vnpy.trader.object import ContractData, TickData
+
+
+class TickContext:
+    """
+    合约行情上下文
+
+    在收到合约信息时预先计算好行情推送中需要的合约属性，
+    并保存一个TickData模板，推送时直接复制模板字段生成新对象，
+    省去构造函数中重复的参数处理和vt_symbol拼接。
+    """
+
+    __slots__ = ("symbol", "exchange", "name", "pricetick", "size", "local_date", "template")
+
+    def __init__(self, contract: ContractData, gateway_name: str) -> None:
+        """构造函数"""
+        self.symbol: str = contract.symbol
+        self.exchange: Exchange = contract.exchange
+        self.name: str = contract.name
+        self.pricetick: float = contract.pricetick
+        self.size: float = contract.size
+
+        # 大商所的交易日字段需要取本地日期
+        self.local_date: bool = contract.exchange == Exchange.DCE
+
+        tick: TickData = TickData(
+            symbol=contract.symbol,
+            exchange=contract.exchange,
+            datetime=None,
+            name=contract.name,
+            gateway_name=gateway_name
+        )
+        self.template: dict = tick.__dict__
+
+    def new_tick(self, fields: dict) -> TickData:
+        """基于模板生成TickData，fields中为本次推送的行情字段"""
+        tick: TickData = TickData.__new__(TickData)
+        data: dict = tick.__dict__
+        data.update(self.template)
+        data.update(fields)
+        return tick
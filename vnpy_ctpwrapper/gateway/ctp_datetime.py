@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta, tzinfo
+from typing import Dict, Tuple
+
+
+# 预先生成的毫秒偏移量，避免每次推送时创建timedelta对象
+MILLISEC_DELTAS: Tuple[timedelta, ...] = tuple(timedelta(milliseconds=i) for i in range(1000))
+
+
+class TimestampResolver:
+    """
+    CTP时间戳解析器
+
+    按（日期，时分秒）缓存带时区的datetime对象，
+    同一秒内的后续推送只需叠加毫秒偏移量。
+    """
+
+    def __init__(self, tz: tzinfo, max_size: int = 200_000) -> None:
+        """构造函数"""
+        self.tz: tzinfo = tz
+        self.max_size: int = max_size
+
+        self.cache: Dict[Tuple[str, str], datetime] = {}
+
+    def resolve(self, date_str: str, time_str: str, millisec: int = 0) -> datetime:
+        """解析日期（%Y%m%d）、时间（%H:%M:%S）和毫秒"""
+        key: Tuple[str, str] = (date_str, time_str)
+        dt: datetime | None = self.cache.get(key, None)
+
+        if dt is None:
+            dt = datetime.strptime(f"{date_str} {time_str}", "%Y%m%d %H:%M:%S")
+            dt = dt.replace(tzinfo=self.tz)
+
+            # 缓存超过上限后整体清空，避免长时间运行时内存持续增长
+            if len(self.cache) >= self.max_size:
+                self.cache.clear()
+            self.cache[key] = dt
+
+        if not millisec:
+            return dt
+        elif 0 < millisec < 1000:
+            return dt + MILLISEC_DELTAS[millisec]
+        else:
+            return dt + timedelta(milliseconds=millisec)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self.cache.clear()
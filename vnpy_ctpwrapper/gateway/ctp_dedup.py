@@ -0,0 +1,106 @@
+from threading import Lock
+from time import time_ns
+from typing import Callable, Dict, List, Tuple
+
+
+# 早于该时间的行情属于夜盘零点之后或日盘，排在同一交易日的夜盘前半段之后
+NIGHT_START: str = "18:00:00"
+
+
+def get_order_key(data: object) -> tuple:
+    """生成行情在交易日内的先后顺序标识"""
+    update_time: str = data.UpdateTime
+    return (
+        data.TradingDay,
+        update_time < NIGHT_START,
+        update_time,
+        data.UpdateMillisec,
+        data.Volume
+    )
+
+
+class FrontStatistics:
+    """
+    单个行情前置的统计数据
+    """
+
+    def __init__(self) -> None:
+        """构造函数"""
+        self.wins: int = 0              # 最先到达的次数
+        self.losses: int = 0            # 重复到达的次数
+        self.lag_total: int = 0         # 重复到达时相对最先到达的延迟累计（纳秒）
+        self.lag_max: int = 0
+
+
+class TickDeduplicator:
+    """
+    多行情前置的首达去重器
+
+    以（合约，更新时间，毫秒，成交量）标识一笔行情，只转发最先到达的一份，
+    其余前置的重复推送直接丢弃，并统计各前置的首达率和延迟。
+    每个合约同时记录最近转发的行情顺序，落后较多的前置推送的旧行情
+    即使已经超出标识窗口，也不会再次转发，同样计为重复到达。
+    各前置回调线程通过同一把锁串行进入后续处理流程。
+    """
+
+    def __init__(self, forward: Callable[[object], None], front_count: int, window: int = 16) -> None:
+        """构造函数"""
+        self.forward: Callable[[object], None] = forward
+        self.window: int = window
+
+        self.lock: Lock = Lock()
+        self.seen: Dict[str, Dict[Tuple, Tuple[int, int]]] = {}
+        self.last: Dict[str, tuple] = {}
+        self.statistics: List[FrontStatistics] = [FrontStatistics() for _ in range(front_count)]
+
+    def on_depth_market_data(self, data: object, front: int) -> None:
+        """收到某个前置的行情推送"""
+        now: int = time_ns()
+        symbol: str = data.InstrumentID
+        key: tuple = (data.UpdateTime, data.UpdateMillisec, data.Volume)
+        statistics: FrontStatistics = self.statistics[front]
+
+        with self.lock:
+            seen: Dict[Tuple, Tuple[int, int]] | None = self.seen.get(symbol, None)
+            if seen is None:
+                seen = {}
+                self.seen[symbol] = seen
+
+            first: Tuple[int, int] | None = seen.get(key, None)
+            if first:
+                statistics.losses += 1
+                lag: int = now - first[1]
+                statistics.lag_total += lag
+                if lag > statistics.lag_max:
+                    statistics.lag_max = lag
+                return
+
+            # 不晚于已转发行情的旧数据，无法计算延迟，只计为重复到达
+            order: tuple = get_order_key(data)
+            last: tuple | None = self.last.get(symbol, None)
+            if last and order <= last:
+                statistics.losses += 1
+                return
+            self.last[symbol] = order
+
+            # 每个合约只保留最近若干笔行情的标识
+            seen[key] = (front, now)
+            if len(seen) > self.window:
+                del seen[next(iter(seen))]
+
+            statistics.wins += 1
+            self.forward(data)
+
+    def get_statistics(self) -> List[Dict[str, float]]:
+        """查询各前置的统计数据，延迟单位为毫秒"""
+        result: list = []
+        for statistics in self.statistics:
+            total: int = statistics.wins + statistics.losses
+            result.append({
+                "wins": statistics.wins,
+                "losses": statistics.losses,
+                "win_rate": statistics.wins / total if total else 0,
+                "lag_mean": statistics.lag_total / statistics.losses / 1e6 if statistics.losses else 0,
+                "lag_max": statistics.lag_max / 1e6,
+            })
+        return result
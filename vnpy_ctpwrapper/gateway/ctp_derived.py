@@ -0,0 +1,80 @@
+from typing import Dict
+
+
+class DerivedState:
+    """
+    单个合约上一笔行情的累计值
+    """
+
+    __slots__ = ("trading_day", "volume", "turnover", "open_interest")
+
+    def __init__(self, trading_day: str, volume: float, turnover: float, open_interest: float) -> None:
+        """构造函数"""
+        self.trading_day: str = trading_day
+        self.volume: float = volume
+        self.turnover: float = turnover
+        self.open_interest: float = open_interest
+
+
+class TickDeriver:
+    """
+    行情衍生字段计算
+
+    CTP推送的成交量和成交额为交易日内的累计值，这里按合约保存上一笔的
+    累计值，计算本笔的成交量、成交额增量、交易日内成交均价和持仓量变化，
+    以字典形式挂到TickData.extra上。交易日切换时累计值从零开始，
+    同一交易日内累计值回退（如前置重启）时以本笔为新的基准。
+    """
+
+    def __init__(self) -> None:
+        """构造函数"""
+        self.states: Dict[str, DerivedState] = {}
+
+    def derive(self, data: object, size: float) -> dict:
+        """计算衍生字段，size为合约乘数"""
+        symbol: str = data.InstrumentID
+        trading_day: str = data.TradingDay
+        volume: float = data.Volume
+        turnover: float = data.Turnover
+        open_interest: float = data.OpenInterest
+
+        state: DerivedState | None = self.states.get(symbol, None)
+
+        # 首笔行情无法得知之前的成交，增量记为0
+        if not state:
+            self.states[symbol] = DerivedState(trading_day, volume, turnover, open_interest)
+            volume_change: float = 0
+            turnover_change: float = 0
+            open_interest_change: float = 0
+        else:
+            if state.trading_day != trading_day:
+                state.trading_day = trading_day
+                state.volume = 0
+                state.turnover = 0
+
+            volume_change = volume - state.volume
+            turnover_change = turnover - state.turnover
+            if volume_change < 0 or turnover_change < 0:
+                volume_change = turnover_change = 0
+
+            open_interest_change = open_interest - state.open_interest
+
+            state.volume = volume
+            state.turnover = turnover
+            state.open_interest = open_interest
+
+        if volume and size:
+            vwap: float = turnover / volume / size
+        else:
+            vwap = 0
+
+        return {
+            "last_volume": volume_change,
+            "turnover_change": turnover_change,
+            "vwap": vwap,
+            "open_interest_change": open_interest_change,
+        }
+
+    def clear(self) -> None:
+        """清空所有合约的状态"""
+        self.states.clear()
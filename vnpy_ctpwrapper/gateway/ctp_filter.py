@@ -0,0 +1,54 @@
+from collections import defaultdict
+from operator import attrgetter
+from typing import Callable, Dict
+
+
+# 用于判断行情是否发生变化的关键字段
+get_fingerprint: Callable = attrgetter(
+    "Volume",
+    "LastPrice",
+    "OpenInterest",
+    "BidPrice1",
+    "AskPrice1",
+    "BidVolume1",
+    "AskVolume1",
+)
+
+
+class TickFilter:
+    """
+    重复行情过滤器
+
+    记录每个合约最近一笔行情的关键字段，成交量、最新价、持仓量和
+    一档盘口均未变化的推送视为重复行情，在构造TickData之前丢弃。
+    """
+
+    def __init__(self) -> None:
+        """构造函数"""
+        self.fingerprints: Dict[str, tuple] = {}
+        self.suppressed: Dict[str, int] = defaultdict(int)
+
+    def check(self, data: object) -> bool:
+        """检查行情，重复行情返回False"""
+        fingerprint: tuple = get_fingerprint(data)
+        symbol: str = data.InstrumentID
+
+        if self.fingerprints.get(symbol, None) == fingerprint:
+            self.suppressed[symbol] += 1
+            return False
+
+        self.fingerprints[symbol] = fingerprint
+        return True
+
+    def get_suppressed_count(self, symbol: str) -> int:
+        """查询合约被过滤的行情数量"""
+        return self.suppressed.get(symbol, 0)
+
+    def get_suppressed_counts(self) -> Dict[str, int]:
+        """查询所有合约被过滤的行情数量"""
+        return dict(self.suppressed)
+
+    def clear(self) -> None:
+        """清空状态"""
+        self.fingerprints.clear()
+        self.suppressed.clear()
@@ -1,5 +1,8 @@
+import os
 import sys
 from datetime import datetime
+from threading import Lock
+from zlib import crc32
 from time import sleep
 from typing import Any, Dict, List, Tuple
 from pathlib import Path
@@ -84,6 +87,26 @@ from .ctp_constant import (
     THOST_FTDC_BZTP_Future,
 
 )
+from .ctp_datetime import TimestampResolver
+from .ctp_store import TickStore
+from .ctp_conflation import TickConflator
+from .ctp_recorder import TickRecorder
+from .ctp_filter import TickFilter
+from .ctp_context import TickContext
+from .ctp_handoff import TickHandoff
+from .ctp_bar import BarAggregator
+from .ctp_dedup import TickDeduplicator
+from .ctp_subscription import SubscriptionPipeline, SubscriptionRegistry
+from .ctp_index import ContractIndex
+from .ctp_latency import LatencyMonitor
+from .ctp_derived import TickDeriver
+from .ctp_board import SnapshotBoard
+from .ctp_ring import TickRing
+from .ctp_publisher import TickPublisher
+from .ctp_cache import ContractCache
+from .ctp_compact import CompactContractStore, ContractView, estimate_contract_size
+from .ctp_batch import ContractBatcher
+from .ctp_registry import ContractRegistry, shared_registry
 
 
 # 委托状态映射
@@ -150,9 +173,6 @@ OPTIONTYPE_CTP2VT: Dict[str, OptionType] = {
 MAX_FLOAT = sys.float_info.max                  # 浮点数极限值
 CHINA_TZ = ZoneInfo("Asia/Shanghai")       # 中国时区
 
-# 合约数据全局缓存字典
-symbol_contract_map: Dict[str, ContractData] = {}
-
 
 class CtpGateway(BaseGateway):
     """
@@ -168,7 +188,8 @@ class CtpGateway(BaseGateway):
         "交易服务器": "",
         "行情服务器": "",
         "产品名称": "",
-        "授权编码": ""
+        "授权编码": "",
+        "行情会话数": "1"
     }
 
     exchanges: List[Exchange] = list(EXCHANGE_CTP2VT.values())
@@ -177,9 +198,33 @@ class CtpGateway(BaseGateway):
         """构造函数"""
         super().__init__(event_engine, gateway_name)
 
+        # 行情订阅流水线参数，新建的行情会话同样使用
+        self.subscription_setting: Dict[str, Any] = {}
+
         self.td_api: "CtpTdApi" = CtpTdApi(self)
         self.md_api: "CtpMdApi" = CtpMdApi(self)
 
+        # 多行情前置时，md_api为第一个前置，负责后续的行情处理
+        self.md_apis: List["CtpMdApi"] = [self.md_api]
+        self.deduplicator: TickDeduplicator | None = None
+        self.shard_count: int = 1
+
+        self.registry: SubscriptionRegistry = SubscriptionRegistry()
+
+        # 合约注册表默认由网关独享，通过enable_shared_contracts与其他网关共享
+        self.contract_registry: ContractRegistry = ContractRegistry()
+        self.contract_index: ContractIndex = self.contract_registry.index
+
+    def set_contract_registry(self, registry: ContractRegistry) -> None:
+        """使用指定的合约注册表，需要在连接前调用"""
+        self.contract_registry = registry
+        self.contract_index = registry.index
+
+    def enable_shared_contracts(self, registry: ContractRegistry | None = None) -> ContractRegistry:
+        """与进程内其他网关共享合约注册表，默认使用shared_registry，需要在连接前调用"""
+        self.set_contract_registry(registry or shared_registry)
+        return self.contract_registry
+
     def connect(self, setting: dict) -> None:
         """连接交易接口"""
         userid: str = setting["用户名"]
@@ -190,29 +235,139 @@ class CtpGateway(BaseGateway):
         appid: str = setting["产品名称"]
         auth_code: str = setting["授权编码"]
 
-        if (
-            (not td_address.startswith("tcp://"))
-            and (not td_address.startswith("ssl://"))
-            and (not td_address.startswith("socks"))
-        ):
-            td_address = "tcp://" + td_address
+        td_address = format_address(td_address)
 
-        if (
-            (not md_address.startswith("tcp://"))
-            and (not md_address.startswith("ssl://"))
-            and (not md_address.startswith("socks"))
-        ):
-            md_address = "tcp://" + md_address
+        # 行情服务器支持用分号分隔填写多个前置地址
+        md_addresses: List[str] = [
+            format_address(address.strip())
+            for address in md_address.split(";")
+            if address.strip()
+        ]
 
         self.td_api.connect(td_address, userid, password,
                             brokerid, auth_code, appid)
-        self.md_api.connect(md_address, userid, password, brokerid)
+
+        # 行情会话数大于1时按合约分片订阅，否则多个地址互为冗余
+        shard_count: int = int(setting.get("行情会话数", 1) or 1)
+        if shard_count > 1:
+            self.init_shards(shard_count)
+            md_addresses = [md_addresses[i % len(md_addresses)] for i in range(shard_count)]
+        elif len(md_addresses) > 1:
+            self.init_fronts(len(md_addresses))
+
+        for md_api, address in zip(self.md_apis, md_addresses):
+            md_api.connect(address, userid, password, brokerid)
 
         self.init_query()
 
+    def init_fronts(self, count: int) -> None:
+        """初始化多个冗余行情前置"""
+        if len(self.md_apis) > 1:
+            return
+
+        for i in range(1, count):
+            self.md_apis.append(CtpMdApi(self, i))
+
+        self.deduplicator = TickDeduplicator(self.md_api.dispatch_depth_market_data, count)
+        for md_api in self.md_apis:
+            md_api.deduplicator = self.deduplicator
+
+    def init_shards(self, count: int) -> None:
+        """初始化多个分片行情会话"""
+        if len(self.md_apis) > 1:
+            return
+
+        for i in range(1, count):
+            self.md_apis.append(CtpMdApi(self, i))
+        self.shard_count = count
+
+        lock: Lock = Lock()
+        for md_api in self.md_apis:
+            md_api.shard_lock = lock
+
+        # 连接前已订阅的合约重新分配到对应分片
+        symbols: set = self.md_api.subscribed
+        self.md_api.subscribed = set()
+        for symbol in symbols:
+            self.get_md_api(symbol).subscribed.add(symbol)
+
+    def get_md_api(self, symbol: str) -> "CtpMdApi":
+        """获取合约所在分片的行情接口"""
+        if self.shard_count == 1:
+            return self.md_api
+        return self.md_apis[crc32(symbol.encode()) % self.shard_count]
+
     def subscribe(self, req: SubscribeRequest) -> None:
         """订阅行情"""
-        self.md_api.subscribe(req)
+        self.subscribe_symbols([req.symbol])
+
+    def subscribe_symbols(self, symbols: List[str]) -> None:
+        """批量订阅行情"""
+        # 已被其他调用方订阅的合约只增加引用计数
+        symbols = [symbol for symbol in symbols if self.registry.acquire(symbol)]
+        if not symbols:
+            return
+
+        if self.shard_count > 1:
+            shard_symbols: Dict["CtpMdApi", List[str]] = {}
+            for symbol in symbols:
+                shard_symbols.setdefault(self.get_md_api(symbol), []).append(symbol)
+
+            for md_api, shard_list in shard_symbols.items():
+                md_api.subscribe_symbols(shard_list)
+        else:
+            for md_api in self.md_apis:
+                md_api.subscribe_symbols(symbols)
+
+    def query_contracts(
+        self,
+        product_id: str = "",
+        exchange: Exchange | None = None,
+        underlying: str = "",
+        expiry: str = ""
+    ) -> List[ContractData]:
+        """按品种代码、交易所、期权标的和到期日查询合约，指定标的时按行权价排序"""
+        symbols: List[str] = self.contract_index.query(product_id, exchange, underlying, expiry)
+        contracts: Dict[str, ContractData] = self.contract_registry.contracts
+        return [contracts[symbol] for symbol in symbols if symbol in contracts]
+
+    def get_option_chain(self, underlying: str) -> List[ContractData]:
+        """查询标的对应的期权链，按行权价排序"""
+        return self.query_contracts(underlying=underlying)
+
+    def get_expiries(self, product_id: str = "") -> List[str]:
+        """查询所有到期日，可以限定品种"""
+        return self.contract_index.get_expiries(product_id)
+
+    def subscribe_product(self, product_id: str) -> List[str]:
+        """订阅品种下的所有合约，返回订阅的合约代码"""
+        symbols: List[str] = self.contract_index.get_product_symbols(product_id)
+        self.subscribe_symbols(symbols)
+        return symbols
+
+    def subscribe_exchange(self, exchange: Exchange) -> List[str]:
+        """订阅交易所的所有合约，返回订阅的合约代码"""
+        symbols: List[str] = self.contract_index.get_exchange_symbols(exchange)
+        self.subscribe_symbols(symbols)
+        return symbols
+
+    def subscribe_chain(self, underlying: str) -> List[str]:
+        """订阅标的对应的所有期权合约，返回订阅的合约代码"""
+        symbols: List[str] = self.contract_index.get_chain_symbols(underlying)
+        self.subscribe_symbols(symbols)
+        return symbols
+
+    def unsubscribe(self, req: SubscribeRequest) -> None:
+        """退订行情"""
+        # 引用计数归零后才真正退订
+        if not self.registry.release(req.symbol):
+            return
+
+        if self.shard_count > 1:
+            self.get_md_api(req.symbol).unsubscribe(req)
+        else:
+            for md_api in self.md_apis:
+                md_api.unsubscribe(req)
 
     def send_order(self, req: OrderRequest) -> str:
         """委托下单"""
@@ -232,8 +387,16 @@ class CtpGateway(BaseGateway):
 
     def close(self) -> None:
         """关闭接口"""
+        self.disable_handoff()
+        self.disable_bar_aggregator()
+        self.disable_conflation()
+        self.disable_recorder()
+        self.disable_snapshot_board()
+        self.disable_tick_ring()
+        self.disable_publisher()
         self.td_api.close()
-        self.md_api.close()
+        for md_api in self.md_apis:
+            md_api.close()
 
     def write_error(self, msg: str, pRspInfo: RspInfoField) -> None:
         """输出错误信息日志"""
@@ -260,16 +423,276 @@ class CtpGateway(BaseGateway):
         self.query_functions: list = [self.query_account, self.query_position]
         self.event_engine.register(EVENT_TIMER, self.process_timer_event)
 
+    def enable_contract_cache(self, path: str = "") -> ContractCache:
+        """启用按交易日保存的合约缓存，需要在连接前调用"""
+        if not self.td_api.contract_cache:
+            if path:
+                folder: Path = Path(path)
+            else:
+                folder: Path = get_folder_path(self.gateway_name.lower()).joinpath("contracts")
+            self.td_api.contract_cache = ContractCache(folder)
+        return self.td_api.contract_cache
+
+    def enable_bulk_contracts(self, chunk_size: int = 0, per_contract: bool = False) -> ContractBatcher:
+        """
+        启用合约批量推送，以EVENT_CTP_CONTRACTS事件推送合约列表
+
+        chunk_size为0时在查询结束时一次推送，per_contract为True时同时保留逐个合约的事件
+        """
+        if not self.td_api.contract_batcher:
+            self.td_api.contract_batcher = ContractBatcher(self, chunk_size, per_contract)
+        return self.td_api.contract_batcher
+
+    def disable_bulk_contracts(self) -> None:
+        """停用合约批量推送，恢复逐个合约推送"""
+        batcher: ContractBatcher | None = self.td_api.contract_batcher
+        if batcher:
+            self.td_api.contract_batcher = None
+            batcher.flush()
+
+    def enable_compact_contracts(self) -> CompactContractStore:
+        """启用紧凑合约存储，合约映射中保存视图而非完整对象，需要在连接前调用"""
+        if not self.td_api.contract_store:
+            self.td_api.contract_store = CompactContractStore(self.gateway_name)
+        return self.td_api.contract_store
+
+    def get_contract_memory_report(self) -> Dict[str, int]:
+        """统计合约数据占用的内存，未启用紧凑存储时为完整对象的估算值"""
+        store: CompactContractStore | None = self.td_api.contract_store
+        if store:
+            report: Dict[str, int] = store.get_memory_usage()
+            contracts: list = [store.to_contract(i) for i in store.rows.values()]
+        else:
+            report = {"contracts": len(self.contract_registry.contracts)}
+            contracts = list(self.contract_registry.contracts.values())
+
+        # 同样的合约以完整对象保存时的估算值
+        report["dataclass_total"] = sum(estimate_contract_size(contract) for contract in contracts)
+        return report
+
+    def enable_tick_store(self, capacity: int = 2048) -> TickStore:
+        """启用Tick列式缓存"""
+        if not self.md_api.tick_store:
+            self.md_api.tick_store = TickStore(capacity)
+        return self.md_api.tick_store
+
+    def enable_conflation(self) -> TickConflator:
+        """启用Tick行情合并推送"""
+        if not self.md_api.conflator:
+            conflator: TickConflator = TickConflator(self)
+            conflator.start()
+            self.md_api.conflator = conflator
+        return self.md_api.conflator
+
+    def disable_conflation(self) -> None:
+        """停用Tick行情合并推送"""
+        conflator: TickConflator | None = self.md_api.conflator
+        if conflator:
+            self.md_api.conflator = None
+            conflator.stop()
+
+    def enable_recorder(
+        self,
+        path: str = "",
+        capacity: int = 2_000_000,
+        by_product: bool = False
+    ) -> TickRecorder:
+        """启用深度行情记录"""
+        if not self.md_api.recorder:
+            if path:
+                folder: Path = Path(path)
+            else:
+                folder: Path = get_folder_path(self.gateway_name.lower()).joinpath("ticks")
+
+            recorder: TickRecorder = TickRecorder(folder, capacity, by_product, write_log=self.write_log)
+            recorder.start()
+            self.md_api.recorder = recorder
+        return self.md_api.recorder
+
+    def disable_recorder(self) -> None:
+        """停用深度行情记录"""
+        recorder: TickRecorder | None = self.md_api.recorder
+        if recorder:
+            self.md_api.recorder = None
+            recorder.stop()
+
+    def enable_tick_filter(self) -> TickFilter:
+        """启用重复行情过滤"""
+        if not self.md_api.tick_filter:
+            self.md_api.tick_filter = TickFilter()
+        return self.md_api.tick_filter
+
+    def disable_tick_filter(self) -> None:
+        """停用重复行情过滤"""
+        self.md_api.tick_filter = None
+
+    def enable_handoff(self, capacity: int = 65536) -> TickHandoff:
+        """启用行情处理线程，回调线程中只拷贝原始数据"""
+        if not self.md_api.handoff:
+            handoff: TickHandoff = TickHandoff(
+                self.md_api.process_depth_market_data,
+                self.write_log,
+                capacity
+            )
+            handoff.start()
+            self.md_api.handoff = handoff
+        return self.md_api.handoff
+
+    def disable_handoff(self) -> None:
+        """停用行情处理线程"""
+        handoff: TickHandoff | None = self.md_api.handoff
+        if handoff:
+            self.md_api.handoff = None
+            handoff.stop()
+
+    def enable_bar_aggregator(self, windows: List[int] | None = None) -> BarAggregator:
+        """启用K线合成，windows为1分钟以外需要合成的N分钟周期"""
+        if not self.md_api.bar_aggregator:
+            self.md_api.bar_aggregator = BarAggregator(self, CHINA_TZ, windows)
+        return self.md_api.bar_aggregator
+
+    def disable_bar_aggregator(self) -> None:
+        """停用K线合成，并推送未完成的K线"""
+        aggregator: BarAggregator | None = self.md_api.bar_aggregator
+        if aggregator:
+            self.md_api.bar_aggregator = None
+            aggregator.flush()
+
+    def enable_snapshot_board(self, name: str = "", capacity: int = 4096) -> SnapshotBoard:
+        """启用共享内存最新行情快照板，其他进程通过SnapshotReader读取"""
+        if not self.md_api.snapshot_board:
+            if not name:
+                name = f"ctp_board_{self.gateway_name.lower()}_{os.getpid()}"
+            self.md_api.snapshot_board = SnapshotBoard(name, capacity)
+            self.write_log(f"行情快照板已启用，共享内存名称{name}")
+        return self.md_api.snapshot_board
+
+    def disable_snapshot_board(self) -> None:
+        """停用共享内存最新行情快照板"""
+        board: SnapshotBoard | None = self.md_api.snapshot_board
+        if board:
+            self.md_api.snapshot_board = None
+            board.close()
+
+    def enable_tick_ring(self, name: str = "", capacity: int = 65536) -> TickRing:
+        """启用共享内存逐笔行情环形队列，其他进程通过TickRingReader读取"""
+        if not self.md_api.tick_ring:
+            if not name:
+                name = f"ctp_ring_{self.gateway_name.lower()}_{os.getpid()}"
+            self.md_api.tick_ring = TickRing(name, capacity)
+            self.write_log(f"逐笔行情环形队列已启用，共享内存名称{name}")
+        return self.md_api.tick_ring
+
+    def disable_tick_ring(self) -> None:
+        """停用共享内存逐笔行情环形队列"""
+        ring: TickRing | None = self.md_api.tick_ring
+        if ring:
+            self.md_api.tick_ring = None
+            ring.close()
+
+    def enable_publisher(
+        self,
+        path: str = "",
+        max_buffer: int = 4 * 1024 * 1024,
+        max_queue: int = 65536
+    ) -> TickPublisher:
+        """启用Unix域套接字行情发布，其他进程通过TickSubscriber订阅"""
+        if not self.md_api.publisher:
+            if not path:
+                path = str(get_folder_path(self.gateway_name.lower()).joinpath("ticks.sock"))
+
+            publisher: TickPublisher = TickPublisher(path, self.write_log, max_buffer=max_buffer, max_queue=max_queue)
+            publisher.start()
+            self.md_api.publisher = publisher
+        return self.md_api.publisher
+
+    def disable_publisher(self) -> None:
+        """停用Unix域套接字行情发布"""
+        publisher: TickPublisher | None = self.md_api.publisher
+        if publisher:
+            self.md_api.publisher = None
+            publisher.stop()
+
+    def enable_tick_deriver(self) -> TickDeriver:
+        """启用行情衍生字段计算，结果保存在TickData.extra中"""
+        if not self.md_api.tick_deriver:
+            self.md_api.tick_deriver = TickDeriver()
+        return self.md_api.tick_deriver
+
+    def disable_tick_deriver(self) -> None:
+        """停用行情衍生字段计算"""
+        self.md_api.tick_deriver = None
+
+    def enable_latency_monitor(self) -> LatencyMonitor:
+        """启用行情延迟监控"""
+        if not self.md_api.latency_monitor:
+            self.md_api.latency_monitor = LatencyMonitor()
+        return self.md_api.latency_monitor
+
+    def disable_latency_monitor(self) -> None:
+        """停用行情延迟监控"""
+        self.md_api.latency_monitor = None
+
+    def get_latency_statistics(self, symbol: str = "", exchange: Exchange | None = None) -> Dict[str, Dict[str, Any]]:
+        """查询行情延迟直方图，不指定合约和交易所时返回所有交易所的统计"""
+        if not self.md_api.latency_monitor:
+            return {}
+        return self.md_api.latency_monitor.get_statistics(symbol, exchange)
+
+    def configure_subscription(
+        self,
+        chunk_size: int = 500,
+        interval: float = 0.05,
+        ack_timeout: float = 5,
+        max_retries: int = 3
+    ) -> None:
+        """设置订阅流水线的批次大小、发送间隔、回报超时和重试次数"""
+        self.subscription_setting = {
+            "chunk_size": chunk_size,
+            "interval": interval,
+            "ack_timeout": ack_timeout,
+            "max_retries": max_retries,
+        }
+
+        for md_api in self.md_apis:
+            subscription: SubscriptionPipeline = md_api.subscription
+            subscription.chunk_size = chunk_size
+            subscription.interval = interval
+            subscription.ack_timeout = ack_timeout
+            subscription.max_retries = max_retries
+
+    def get_session_statistics(self) -> List[Dict[str, Any]]:
+        """查询各行情会话的状态和计数"""
+        return [
+            {
+                "index": md_api.front_index,
+                "connected": md_api.connect_status,
+                "login": md_api.login_status,
+                "subscribed": len(md_api.subscribed),
+                "ticks": md_api.tick_count,
+                "disconnects": md_api.disconnect_count,
+                **md_api.subscription.get_status(),
+            }
+            for md_api in self.md_apis
+        ]
+
+    def get_front_statistics(self) -> List[Dict[str, float]]:
+        """查询多行情前置的首达率和延迟统计"""
+        if not self.deduplicator:
+            return []
+        return self.deduplicator.get_statistics()
+
 
 class CtpMdApi(MdApiPy):
     """"""
 
-    def __init__(self, gateway: CtpGateway) -> None:
+    def __init__(self, gateway: CtpGateway, front_index: int = 0) -> None:
         """构造函数"""
         super().__init__()
 
         self.gateway: CtpGateway = gateway
         self.gateway_name: str = gateway.gateway_name
+        self.front_index: int = front_index
 
         self.reqid: int = 0
 
@@ -283,6 +706,34 @@ class CtpMdApi(MdApiPy):
 
         self.current_date: str = datetime.now().strftime("%Y%m%d")
 
+        self.resolver: TimestampResolver = TimestampResolver(CHINA_TZ)
+
+        self.tick_store: TickStore | None = None
+        self.conflator: TickConflator | None = None
+        self.recorder: TickRecorder | None = None
+        self.tick_filter: TickFilter | None = None
+        self.handoff: TickHandoff | None = None
+        self.bar_aggregator: BarAggregator | None = None
+        self.deduplicator: TickDeduplicator | None = None
+        self.shard_lock: Lock | None = None
+        self.latency_monitor: LatencyMonitor | None = None
+        self.tick_deriver: TickDeriver | None = None
+        self.snapshot_board: SnapshotBoard | None = None
+        self.tick_ring: TickRing | None = None
+        self.publisher: TickPublisher | None = None
+
+        self.tick_count: int = 0
+        self.disconnect_count: int = 0
+
+        self.subscription: SubscriptionPipeline = SubscriptionPipeline(
+            self.SubscribeMarketData,
+            self.UnSubscribeMarketData,
+            self.gateway.write_log,
+            **gateway.subscription_setting
+        )
+
+        self.contexts: Dict[str, TickContext] = {}
+
     def OnFrontConnected(self) -> None:
         """服务器连接成功回报"""
         self.gateway.write_log("行情服务器连接成功")
@@ -291,6 +742,8 @@ class CtpMdApi(MdApiPy):
     def OnFrontDisconnected(self, nReason: int) -> None:
         """服务器连接断开回报"""
         self.login_status = False
+        self.disconnect_count += 1
+        self.subscription.reset()
         self.gateway.write_log(f"行情服务器连接断开，原因{nReason}")
 
     def OnRspUserLogin(self, pRspUserLogin: RspUserLoginField, pRspInfo: RspInfoField, nRequestID, bIsLast) -> None:
@@ -299,8 +752,10 @@ class CtpMdApi(MdApiPy):
         if not pRspInfo.ErrorID:
             self.login_status = True
             self.gateway.write_log("行情服务器登录成功")
-            pInstrumentID = list(self.subscribed)
-            self.SubscribeMarketData(pInstrumentID)
+
+            # 重新订阅所有合约，由订阅流水线分批发送
+            self.subscription.reset()
+            self.subscription.add(list(self.subscribed))
         else:
             self.gateway.write_error("行情服务器登录失败", pRspInfo)
 
@@ -310,54 +765,107 @@ class CtpMdApi(MdApiPy):
 
     def OnRspSubMarketData(self, pSpecificInstrument: SpecificInstrumentField, pRspInfo: RspInfoField, nRequestID, bIsLast) -> None:
         """订阅行情回报"""
+        if pSpecificInstrument:
+            self.subscription.on_ack(pSpecificInstrument.InstrumentID, not pRspInfo.ErrorID)
+
         if not pRspInfo.ErrorID:
             return
         self.gateway.write_error("行情订阅失败", pRspInfo)
 
+    def OnRspUnSubMarketData(self, pSpecificInstrument: SpecificInstrumentField, pRspInfo: RspInfoField, nRequestID, bIsLast) -> None:
+        """退订行情回报"""
+        if not pRspInfo.ErrorID:
+            return
+        self.gateway.write_error("行情退订失败", pRspInfo)
+
     def OnRtnDepthMarketData(self, pDepthMarketData: DepthMarketDataField) -> None:
         """行情数据推送"""
+        self.tick_count += 1
+
+        # 延迟监控挂在第一个会话上，各前置和分片共用
+        monitor: LatencyMonitor | None = self.gateway.md_api.latency_monitor
+        if monitor:
+            monitor.on_receive()
+
+        # 多行情前置时，只有最先到达的行情进入处理流程
+        if self.deduplicator:
+            self.deduplicator.on_depth_market_data(pDepthMarketData, self.front_index)
+        # 分片会话的行情串行进入第一个会话的处理流程
+        elif self.shard_lock:
+            with self.shard_lock:
+                self.gateway.md_api.dispatch_depth_market_data(pDepthMarketData)
+        else:
+            self.dispatch_depth_market_data(pDepthMarketData)
+
+    def dispatch_depth_market_data(self, pDepthMarketData: DepthMarketDataField) -> None:
+        """分发行情数据"""
+        # 启用处理线程时，回调线程中只拷贝原始数据
+        if self.handoff:
+            self.handoff.put(pDepthMarketData)
+        else:
+            self.process_depth_market_data(pDepthMarketData)
+
+    def process_depth_market_data(self, pDepthMarketData: DepthMarketDataField, recv_ns: int = 0) -> None:
+        """处理行情数据，recv_ns为交接队列写入时的接收时间，直接处理时为0"""
         # 过滤没有时间戳的异常行情数据
         if not pDepthMarketData.UpdateTime:
             return
 
         # 过滤还没有收到合约数据前的行情推送
         symbol: str = pDepthMarketData.InstrumentID
-        contract: ContractData | None = symbol_contract_map.get(symbol, None)
-        if not contract:
+        context: TickContext | None = self.contexts.get(symbol, None)
+        if not context:
+            contract: ContractData | None = self.gateway.contract_registry.get(symbol)
+            if not contract:
+                return
+            context = self.update_context(contract)
+
+        if self.recorder:
+            self.recorder.record(pDepthMarketData, context.exchange.value)
+
+        if self.snapshot_board:
+            self.snapshot_board.update(pDepthMarketData)
+
+        if self.tick_ring:
+            self.tick_ring.put(pDepthMarketData)
+
+        if self.publisher:
+            self.publisher.publish(pDepthMarketData)
+
+        # 过滤关键字段未发生变化的重复行情
+        if self.tick_filter and not self.tick_filter.check(pDepthMarketData):
             return
 
         # 对大商所的交易日字段取本地日期
-        if not pDepthMarketData.ActionDay or contract.exchange == Exchange.DCE:
+        if not pDepthMarketData.ActionDay or context.local_date:
             date_str: str = self.current_date
         else:
             date_str: str = pDepthMarketData.ActionDay
 
-        timestamp: str = f"{date_str} {pDepthMarketData.UpdateTime}.{pDepthMarketData.UpdateMillisec}"
-        dt: datetime = datetime.strptime(timestamp, "%Y%m%d %H:%M:%S.%f")
-        dt: datetime = dt.replace(tzinfo=CHINA_TZ)
-
-        tick: TickData = TickData(
-            symbol=symbol,
-            exchange=contract.exchange,
-            datetime=dt,
-            name=contract.name,
-            volume=pDepthMarketData.Volume,
-            turnover=pDepthMarketData.Turnover,
-            open_interest=pDepthMarketData.OpenInterest,
-            last_price=adjust_price(pDepthMarketData.LastPrice),
-            limit_up=pDepthMarketData.UpperLimitPrice,
-            limit_down=pDepthMarketData.LowerLimitPrice,
-            open_price=adjust_price(pDepthMarketData.OpenPrice),
-            high_price=adjust_price(pDepthMarketData.HighestPrice),
-            low_price=adjust_price(pDepthMarketData.LowestPrice),
-            pre_close=adjust_price(pDepthMarketData.PreClosePrice),
-            bid_price_1=adjust_price(pDepthMarketData.BidPrice1),
-            ask_price_1=adjust_price(pDepthMarketData.AskPrice1),
-            bid_volume_1=pDepthMarketData.BidVolume1,
-            ask_volume_1=pDepthMarketData.AskVolume1,
-            gateway_name=self.gateway_name
+        dt: datetime = self.resolver.resolve(
+            date_str,
+            pDepthMarketData.UpdateTime,
+            pDepthMarketData.UpdateMillisec
         )
 
+        tick: TickData = context.new_tick({
+            "datetime": dt,
+            "volume": pDepthMarketData.Volume,
+            "turnover": pDepthMarketData.Turnover,
+            "open_interest": pDepthMarketData.OpenInterest,
+            "last_price": adjust_price(pDepthMarketData.LastPrice),
+            "limit_up": pDepthMarketData.UpperLimitPrice,
+            "limit_down": pDepthMarketData.LowerLimitPrice,
+            "open_price": adjust_price(pDepthMarketData.OpenPrice),
+            "high_price": adjust_price(pDepthMarketData.HighestPrice),
+            "low_price": adjust_price(pDepthMarketData.LowestPrice),
+            "pre_close": adjust_price(pDepthMarketData.PreClosePrice),
+            "bid_price_1": adjust_price(pDepthMarketData.BidPrice1),
+            "ask_price_1": adjust_price(pDepthMarketData.AskPrice1),
+            "bid_volume_1": pDepthMarketData.BidVolume1,
+            "ask_volume_1": pDepthMarketData.AskVolume1,
+        })
+
         if pDepthMarketData.BidVolume2 or pDepthMarketData.AskVolume2:
             tick.bid_price_2 = adjust_price(pDepthMarketData.BidPrice2)
             tick.bid_price_3 = adjust_price(pDepthMarketData.BidPrice3)
@@ -379,7 +887,23 @@ class CtpMdApi(MdApiPy):
             tick.ask_volume_4 = pDepthMarketData.AskVolume4
             tick.ask_volume_5 = pDepthMarketData.AskVolume5
 
-        self.gateway.on_tick(tick)
+        if self.tick_deriver:
+            tick.extra = self.tick_deriver.derive(pDepthMarketData, context.size)
+
+        if self.tick_store:
+            self.tick_store.update_tick(tick)
+
+        if self.bar_aggregator:
+            self.bar_aggregator.update_tick(tick)
+
+        if self.conflator:
+            self.conflator.put(tick)
+        else:
+            self.gateway.on_tick(tick)
+
+        # 经过交接队列的行情带有写入时的接收时间
+        if self.latency_monitor:
+            self.latency_monitor.record(symbol, context.exchange, dt, recv_ns)
 
     def connect(self, address: str, userid: str, password: str, brokerid: str) -> None:
         """连接服务器"""
@@ -390,7 +914,10 @@ class CtpMdApi(MdApiPy):
         # 禁止重复发起连接，会导致异常崩溃
         if not self.connect_status:
             path: Path = get_folder_path(self.gateway_name.lower())
-            self.Create((str(path) + "\\Md"))
+            if self.front_index:
+                self.Create((str(path) + f"\\Md{self.front_index}"))
+            else:
+                self.Create((str(path) + "\\Md"))
 
             self.RegisterFront(pszFrontAddress=address)
             self.Init()
@@ -410,12 +937,27 @@ class CtpMdApi(MdApiPy):
 
     def subscribe(self, req: SubscribeRequest) -> None:
         """订阅行情"""
+        self.subscribe_symbols([req.symbol])
+
+    def subscribe_symbols(self, symbols: List[str]) -> None:
+        """批量订阅行情"""
         if self.login_status:
-            self.SubscribeMarketData([req.symbol])
-        self.subscribed.add(req.symbol)
+            self.subscription.add(symbols)
+        self.subscribed.update(symbols)
+
+    def unsubscribe(self, req: SubscribeRequest) -> None:
+        """退订行情"""
+        if req.symbol not in self.subscribed:
+            return
+
+        self.subscribed.remove(req.symbol)
+        if self.login_status:
+            self.subscription.remove([req.symbol])
 
     def close(self) -> None:
         """关闭连接"""
+        self.subscription.stop()
+
         if self.connect_status:
             self.gateway.write_log('CtpMdApi close. ')
 
@@ -423,6 +965,12 @@ class CtpMdApi(MdApiPy):
         """更新当前日期"""
         self.current_date = datetime.now().strftime("%Y%m%d")
 
+    def update_context(self, contract: ContractData) -> TickContext:
+        """更新合约行情上下文"""
+        context: TickContext = TickContext(contract, self.gateway_name)
+        self.contexts[contract.symbol] = context
+        return context
+
 
 class CtpTdApi(TraderApiPy):
     """"""
@@ -460,6 +1008,16 @@ class CtpTdApi(TraderApiPy):
         # {sysorder: order} wait for trade data, then push order data
         self.order_cache: dict[str: OrderData] = {}
 
+        self.resolver: TimestampResolver = TimestampResolver(CHINA_TZ)
+
+        self.trading_day: str = ""
+        self.contract_cache: ContractCache | None = None
+        self.contract_store: CompactContractStore | None = None
+        self.contract_batcher: ContractBatcher | None = None
+        self.pending_contracts: Dict[str, ContractData] = {}
+        self.cached_contracts: Dict[str, ContractData] = {}
+        self.queried_contracts: List[Tuple[ContractData, str, str]] = []
+
     def OnFrontConnected(self) -> None:
         """服务器连接成功回报"""
         self.gateway.write_log("交易服务器连接成功")
@@ -492,8 +1050,17 @@ class CtpTdApi(TraderApiPy):
             self.frontid = pRspUserLogin.FrontID
             self.sessionid = pRspUserLogin.SessionID
             self.login_status = True
+            self.trading_day = pRspUserLogin.TradingDay
             self.gateway.write_log("交易服务器登录成功")
 
+            # 其他网关已经加载了当前交易日的合约时直接使用，
+            # 否则同一交易日内重启时先加载缓存的合约，后续查询回报用于核对更新
+            if not self.contract_inited:
+                if self.gateway.contract_registry.is_loaded(self.trading_day):
+                    self.load_shared_contracts()
+                elif self.contract_cache:
+                    self.load_contract_cache()
+
             # 自动确认结算单
             self.reqid += 1
             pSettlementInfoConfirm = SettlementInfoConfirmField(
@@ -509,7 +1076,7 @@ class CtpTdApi(TraderApiPy):
         orderid: str = f"{self.frontid}_{self.sessionid}_{order_ref}"
 
         symbol: str = pInputOrder.InstrumentID
-        contract: ContractData = symbol_contract_map[symbol]
+        contract: ContractData = self.get_contract(symbol)
 
         order: OrderData = OrderData(
             symbol=symbol,
@@ -534,6 +1101,10 @@ class CtpTdApi(TraderApiPy):
         """确认结算单回报"""
         self.gateway.write_log("结算信息确认成功")
 
+        # 当前交易日的合约已经加载过，无需重复查询
+        if self.gateway.contract_registry.is_loaded(self.trading_day):
+            return
+
         # 由于流控，单次查询可能失败，通过while循环持续尝试，直到成功发出请求
         while True:
             self.reqid += 1
@@ -552,7 +1123,7 @@ class CtpTdApi(TraderApiPy):
 
         # 必须已经收到了合约信息后才能处理
         symbol: str = pInvestorPosition.InstrumentID
-        contract: ContractData | None = symbol_contract_map.get(symbol, None)
+        contract: ContractData | None = self.get_contract(symbol)
         direction = pInvestorPosition.PosiDirection
 
         if contract:
@@ -651,21 +1222,139 @@ class CtpTdApi(TraderApiPy):
                 contract.option_expiry = datetime.strptime(
                     pInstrument.ExpireDate, "%Y%m%d")
 
-            self.gateway.on_contract(contract)
+            if self.contract_cache:
+                self.queried_contracts.append((contract, pInstrument.ProductID, pInstrument.ExpireDate))
 
-            symbol_contract_map[contract.symbol] = contract
+            # 与缓存一致的合约不再重复推送
+            if self.cached_contracts.get(contract.symbol, None) != contract:
+                self.add_contract(contract, pInstrument.ProductID, pInstrument.ExpireDate)
 
         if bIsLast:
-            self.contract_inited = True
             self.gateway.write_log("合约信息查询成功")
 
-            for pOrder in self.order_data:
-                self.OnRtnOrder(pOrder)
-            self.order_data.clear()
+            if self.contract_batcher:
+                self.contract_batcher.flush()
+
+            self.publish_contracts()
+            self.gateway.contract_registry.set_loaded(self.trading_day)
 
-            for data in self.trade_data:
-                self.OnRtnTrade(data)
-            self.trade_data.clear()
+            if self.contract_cache:
+                self.update_contract_cache()
+
+            self.set_contract_inited()
+
+    def add_contract(self, contract: ContractData, product_id: str, expiry: str) -> None:
+        """登记合约并推送"""
+        if self.contract_batcher:
+            self.contract_batcher.put(contract)
+        else:
+            self.gateway.on_contract(contract)
+
+        # 启用紧凑存储时，网关内部只保留合约视图
+        if self.contract_store:
+            contract = self.contract_store.add(contract)
+
+        # 先暂存，查询结束后一次性发布到合约注册表
+        self.pending_contracts[contract.symbol] = contract
+        self.gateway.md_api.update_context(contract)
+        self.gateway.contract_index.add(contract, product_id, expiry)
+
+    def get_contract(self, symbol: str) -> ContractData | None:
+        """查询合约，包括已推送但尚未发布到注册表的合约"""
+        contract: ContractData | None = self.gateway.contract_registry.get(symbol)
+        if not contract:
+            contract = self.pending_contracts.get(symbol, None)
+        return contract
+
+    def publish_contracts(self) -> None:
+        """将暂存的合约发布到合约注册表"""
+        self.gateway.contract_registry.update(self.pending_contracts)
+        self.pending_contracts = {}
+
+    def load_shared_contracts(self) -> None:
+        """使用其他网关已经加载的合约"""
+        contracts: Dict[str, ContractData] = self.gateway.contract_registry.contracts
+        for contract in contracts.values():
+            self.gateway.md_api.update_context(contract)
+
+            # 注册表中的合约属于首先加载的网关，推送时复制并改为本网关名称，
+            # 保证委托按合约的gateway_name路由到本账户
+            if isinstance(contract, ContractView):
+                local_contract: ContractData = contract.to_contract()
+            else:
+                local_contract = copy(contract)
+            local_contract.gateway_name = self.gateway_name
+
+            if self.contract_batcher:
+                self.contract_batcher.put(local_contract)
+            else:
+                self.gateway.on_contract(local_contract)
+
+        if self.contract_batcher:
+            self.contract_batcher.flush()
+
+        self.gateway.write_log(f"使用已加载的合约信息，数量{len(contracts)}")
+        self.set_contract_inited()
+
+    def set_contract_inited(self) -> None:
+        """合约信息就绪，处理之前缓存的委托和成交"""
+        self.contract_inited = True
+
+        for pOrder in self.order_data:
+            self.OnRtnOrder(pOrder)
+        self.order_data.clear()
+
+        for data in self.trade_data:
+            self.OnRtnTrade(data)
+        self.trade_data.clear()
+
+    def load_contract_cache(self) -> None:
+        """加载当前交易日的合约缓存"""
+        try:
+            contracts: List[Tuple[ContractData, str, str]] = self.contract_cache.load(self.trading_day, self.gateway_name)
+        except Exception as e:
+            self.gateway.write_log(f"合约缓存加载失败：{e}")
+            return
+
+        if not contracts:
+            return
+
+        for contract, product_id, expiry in contracts:
+            self.add_contract(contract, product_id, expiry)
+            self.cached_contracts[contract.symbol] = contract
+
+        if self.contract_batcher:
+            self.contract_batcher.flush()
+
+        self.publish_contracts()
+        self.gateway.write_log(f"合约缓存加载成功，数量{len(contracts)}")
+        self.set_contract_inited()
+
+    def update_contract_cache(self) -> None:
+        """核对查询结果与缓存的差异，并保存新的缓存"""
+        if self.cached_contracts:
+            queried: set = {contract.symbol for contract, _, _ in self.queried_contracts}
+
+            changed: int = 0
+            for contract, _, _ in self.queried_contracts:
+                if self.cached_contracts.get(contract.symbol, None) != contract:
+                    changed += 1
+
+            # 缓存中有但查询结果中没有的合约已经下市
+            removed: List[str] = [symbol for symbol in self.cached_contracts if symbol not in queried]
+            self.gateway.contract_registry.remove(removed)
+            for symbol in removed:
+                self.gateway.md_api.contexts.pop(symbol, None)
+
+            self.gateway.write_log(f"合约缓存核对完成，新增或变化{changed}，移除{len(removed)}")
+            self.cached_contracts.clear()
+
+        try:
+            self.contract_cache.save(self.trading_day, self.queried_contracts)
+        except Exception as e:
+            self.gateway.write_log(f"合约缓存保存失败：{e}")
+
+        self.queried_contracts = []
 
     def OnRtnOrder(self, pOrder: OrderField) -> None:
         """委托更新推送"""
@@ -674,16 +1363,14 @@ class CtpTdApi(TraderApiPy):
             return
 
         symbol: str = pOrder.InstrumentID
-        contract: ContractData = symbol_contract_map[symbol]
+        contract: ContractData = self.get_contract(symbol)
 
         frontid: int = pOrder.FrontID
         sessionid: int = pOrder.SessionID
         order_ref: str = pOrder.OrderRef
         orderid: str = f"{frontid}_{sessionid}_{order_ref}"
 
-        timestamp: str = f"{pOrder.InsertDate} {pOrder.InsertTime}"
-        dt: datetime = datetime.strptime(timestamp, "%Y%m%d %H:%M:%S")
-        dt: datetime = dt.replace(tzinfo=CHINA_TZ)
+        dt: datetime = self.resolver.resolve(pOrder.InsertDate, pOrder.InsertTime)
 
         tp: tuple = (pOrder.OrderPriceType, pOrder.TimeCondition, pOrder.VolumeCondition)
         order_type: OrderType | None = ORDERTYPE_CTP2VT.get(tp, None)
@@ -742,14 +1429,12 @@ class CtpTdApi(TraderApiPy):
             return
 
         symbol: str = pTrade.InstrumentID
-        contract: ContractData = symbol_contract_map[symbol]
+        contract: ContractData = self.get_contract(symbol)
 
         order_sysid = pTrade.OrderSysID
         orderid: str = self.sysid_orderid_map[order_sysid]
 
-        timestamp: str = f"{pTrade.TradeDate} {pTrade.TradeTime}"
-        dt: datetime = datetime.strptime(timestamp, "%Y%m%d %H:%M:%S")
-        dt: datetime = dt.replace(tzinfo=CHINA_TZ)
+        dt: datetime = self.resolver.resolve(pTrade.TradeDate, pTrade.TradeTime)
         trade: TradeData = TradeData(
             symbol=symbol,
             exchange=contract.exchange,
@@ -905,7 +1590,7 @@ class CtpTdApi(TraderApiPy):
 
     def query_position(self) -> None:
         """查询持仓"""
-        if not symbol_contract_map:
+        if not self.gateway.contract_registry.contracts:
             return
 
         pQryInvestorPosition = QryInvestorPositionField(
@@ -929,5 +1614,16 @@ def adjust_price(price: float) -> float:
     return price
 
 
+def format_address(address: str) -> str:
+    """为未指定协议的服务器地址补充tcp://前缀"""
+    if (
+        (not address.startswith("tcp://"))
+        and (not address.startswith("ssl://"))
+        and (not address.startswith("socks"))
+    ):
+        address = "tcp://" + address
+    return address
+
+
 def to_str(b: bytes) -> str:
     return b.decode('utf8')
@@ -0,0 +1,118 @@
+from threading import Event, Thread
+from time import time_ns
+from traceback import format_exc
+from typing import Callable, Dict
+
+from .ctp_record import RECORD_SIZE, pack_depth_into, unpack_depth_from
+
+
+class TickHandoff:
+    """
+    行情回调线程到处理线程的单生产者单消费者交接队列
+
+    回调线程只把原始字段拷贝进预分配的环形缓冲区并移动写指针，
+    处理线程移动读指针并完成TickData转换和推送。读写指针各自只有一个
+    线程修改，无需加锁；队列写满时丢弃新行情并计数。
+    """
+
+    def __init__(
+        self,
+        process: Callable[[object, int], None],
+        on_error: Callable[[str], None],
+        capacity: int = 65536,
+        timeout: float = 0.001
+    ) -> None:
+        """构造函数，容量会向上取整到2的幂"""
+        size: int = 1
+        while size < capacity:
+            size <<= 1
+
+        # 处理函数同时接收行情和写入队列时的接收时间
+        self.process: Callable[[object, int], None] = process
+        self.on_error: Callable[[str], None] = on_error
+        self.capacity: int = size
+        self.mask: int = size - 1
+        self.timeout: float = timeout
+
+        self.buffer: bytearray = bytearray(size * RECORD_SIZE)
+        self.head: int = 0          # 已写入数量，只由回调线程修改
+        self.tail: int = 0          # 已读取数量，只由处理线程修改
+
+        self.drops: int = 0
+        self.latency_total: int = 0
+        self.latency_max: int = 0
+
+        self.waiting: bool = False
+        self.event: Event = Event()
+        self.active: bool = False
+        self.thread: Thread = Thread(target=self.run, daemon=True)
+
+    def start(self) -> None:
+        """启动处理线程"""
+        if self.active:
+            return
+        self.active = True
+        self.thread.start()
+
+    def stop(self) -> None:
+        """停止处理线程，剩余数据处理完毕后退出"""
+        if not self.active:
+            return
+        self.active = False
+        self.event.set()
+        self.thread.join()
+
+    def put(self, data: object) -> None:
+        """在回调线程中写入行情"""
+        head: int = self.head
+        if head - self.tail >= self.capacity:
+            self.drops += 1
+            return
+
+        pack_depth_into(self.buffer, (head & self.mask) * RECORD_SIZE, data, time_ns())
+        self.head = head + 1
+
+        if self.waiting:
+            self.event.set()
+
+    def run(self) -> None:
+        """处理线程主循环"""
+        while self.active or self.tail != self.head:
+            if self.tail == self.head:
+                self.waiting = True
+                # 设置等待标志后再次检查，超时兜底避免丢失唤醒
+                if self.tail == self.head and self.active:
+                    self.event.wait(self.timeout)
+                    self.event.clear()
+                self.waiting = False
+                continue
+
+            tail: int = self.tail
+            snapshot = unpack_depth_from(self.buffer, (tail & self.mask) * RECORD_SIZE)
+            self.tail = tail + 1
+
+            latency: int = time_ns() - snapshot.recv_ns
+            self.latency_total += latency
+            if latency > self.latency_max:
+                self.latency_max = latency
+
+            try:
+                self.process(snapshot, snapshot.recv_ns)
+            except Exception:
+                self.on_error(format_exc())
+
+    def get_depth(self) -> int:
+        """查询队列中等待处理的数量"""
+        return self.head - self.tail
+
+    def get_statistics(self) -> Dict[str, float]:
+        """查询队列统计信息，延迟单位为微秒"""
+        count: int = self.tail
+        return {
+            "depth": self.head - self.tail,
+            "received": self.head + self.drops,
+            "processed": count,
+            "drops": self.drops,
+            "latency_mean": self.latency_total / count / 1000 if count else 0,
+            "latency_max": self.latency_max / 1000,
+        }
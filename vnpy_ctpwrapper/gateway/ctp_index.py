@@ -0,0 +1,135 @@
+from bisect import insort
+from threading import Lock
+from typing import Dict, List, Tuple
+
+from vnpy.trader.constant import Exchange, Product
+from vnpy.trader.object import ContractData
+
+
+class ContractIndex:
+    """
+    合约二级索引
+
+    在合约查询回报中逐个登记合约，按品种代码、交易所、期权标的和
+    到期日维护合约代码集合，期权链额外按行权价排序保存。
+    批量订阅和合约查询时直接取出，无需遍历全部合约。
+    """
+
+    def __init__(self) -> None:
+        """构造函数"""
+        self.lock: Lock = Lock()
+
+        # 使用字典保存集合，保持合约到达的顺序
+        self.products: Dict[str, Dict[str, None]] = {}
+        self.exchanges: Dict[Exchange, Dict[str, None]] = {}
+        self.underlyings: Dict[str, Dict[str, None]] = {}
+        self.expiries: Dict[str, Dict[str, None]] = {}
+
+        # 期权标的到（行权价，合约代码）的有序列表
+        self.chains: Dict[str, List[Tuple[float, str]]] = {}
+
+    def add(self, contract: ContractData, product_id: str, expiry: str = "") -> None:
+        """
+        登记合约
+
+        product_id为CTP合约字段中的品种代码，expiry为到期日（YYYYMMDD）
+        """
+        symbol: str = contract.symbol
+
+        with self.lock:
+            self.products.setdefault(product_id, {})[symbol] = None
+            self.exchanges.setdefault(contract.exchange, {})[symbol] = None
+
+            if expiry:
+                self.expiries.setdefault(expiry, {})[symbol] = None
+
+            underlying: str = contract.option_underlying
+            if contract.product == Product.OPTION and underlying:
+                symbols: Dict[str, None] = self.underlyings.setdefault(underlying, {})
+                if symbol not in symbols:
+                    symbols[symbol] = None
+                    insort(self.chains.setdefault(underlying, []), (contract.option_strike or 0, symbol))
+
+    def remove(self, symbol: str) -> None:
+        """移除已下市的合约"""
+        with self.lock:
+            for index in (self.products, self.exchanges, self.expiries):
+                for symbols in index.values():
+                    symbols.pop(symbol, None)
+
+            for underlying, symbols in self.underlyings.items():
+                if symbol in symbols:
+                    symbols.pop(symbol)
+                    self.chains[underlying] = [item for item in self.chains[underlying] if item[1] != symbol]
+
+    def get_product_symbols(self, product_id: str) -> List[str]:
+        """查询品种下的所有合约"""
+        with self.lock:
+            return list(self.products.get(product_id, ()))
+
+    def get_exchange_symbols(self, exchange: Exchange) -> List[str]:
+        """查询交易所的所有合约"""
+        with self.lock:
+            return list(self.exchanges.get(exchange, ()))
+
+    def get_chain_symbols(self, underlying: str) -> List[str]:
+        """查询标的对应的所有期权合约，按行权价排序"""
+        with self.lock:
+            return [symbol for _, symbol in self.chains.get(underlying, ())]
+
+    def get_expiry_symbols(self, expiry: str) -> List[str]:
+        """查询到期日的所有合约"""
+        with self.lock:
+            return list(self.expiries.get(expiry, ()))
+
+    def get_expiries(self, product_id: str = "") -> List[str]:
+        """查询所有到期日，可以限定品种"""
+        with self.lock:
+            if not product_id:
+                return sorted(self.expiries)
+
+            symbols: Dict[str, None] = self.products.get(product_id, {})
+            return sorted(
+                expiry for expiry, expiry_symbols in self.expiries.items()
+                if any(symbol in symbols for symbol in expiry_symbols)
+            )
+
+    def query(
+        self,
+        product_id: str = "",
+        exchange: Exchange | None = None,
+        underlying: str = "",
+        expiry: str = ""
+    ) -> List[str]:
+        """按多个条件查询合约，结果为各条件的交集"""
+        with self.lock:
+            # 期权链已按行权价排序，作为结果顺序的基准
+            if underlying:
+                candidates: List[str] = [symbol for _, symbol in self.chains.get(underlying, ())]
+            elif product_id:
+                candidates = list(self.products.get(product_id, ()))
+            elif expiry:
+                candidates = list(self.expiries.get(expiry, ()))
+            elif exchange:
+                candidates = list(self.exchanges.get(exchange, ()))
+            else:
+                return []
+
+            filters: List[Dict[str, None]] = []
+            if product_id:
+                filters.append(self.products.get(product_id, {}))
+            if exchange:
+                filters.append(self.exchanges.get(exchange, {}))
+            if expiry:
+                filters.append(self.expiries.get(expiry, {}))
+
+            return [symbol for symbol in candidates if all(symbol in f for f in filters)]
+
+    def clear(self) -> None:
+        """清空索引"""
+        with self.lock:
+            self.products.clear()
+            self.exchanges.clear()
+            self.underlyings.clear()
+            self.expiries.clear()
+            self.chains.clear()
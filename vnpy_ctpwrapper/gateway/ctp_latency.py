@@ -0,0 +1,176 @@
+from bisect import bisect_right
+from datetime import datetime
+from threading import local
+from time import perf_counter_ns, time_ns
+from typing import Any, Dict, List
+
+from vnpy.trader.constant import Exchange
+
+
+# 行情延迟（本地接收时间减交易所时间）的桶边界，单位微秒，负值说明本地时钟偏慢
+FEED_BOUNDS: List[int] = [
+    -1_000_000, -100_000, -10_000, -1_000, 0,
+    1_000, 2_000, 5_000, 10_000, 20_000, 50_000,
+    100_000, 200_000, 500_000, 1_000_000, 5_000_000
+]
+
+# 处理耗时（回调入口到on_tick返回）的桶边界，单位微秒
+PROCESS_BOUNDS: List[int] = [
+    1, 2, 5, 10, 20, 50, 100, 200, 500,
+    1_000, 2_000, 5_000, 10_000, 100_000
+]
+
+
+class LatencyHistogram:
+    """
+    固定桶数的延迟直方图
+    """
+
+    __slots__ = ("bounds", "counts", "count", "total", "min", "max")
+
+    def __init__(self, bounds: List[int]) -> None:
+        """构造函数"""
+        self.bounds: List[int] = bounds
+        self.counts: List[int] = [0] * (len(bounds) + 1)
+        self.count: int = 0
+        self.total: int = 0
+        self.min: int = 0
+        self.max: int = 0
+
+    def add(self, index: int, value: int) -> None:
+        """计入一个数据，index为所在桶的序号"""
+        self.counts[index] += 1
+
+        if not self.count or value < self.min:
+            self.min = value
+        if not self.count or value > self.max:
+            self.max = value
+
+        self.count += 1
+        self.total += value
+
+    def get_percentile(self, percent: float) -> int:
+        """估算分位数，返回所在桶的上边界"""
+        if not self.count:
+            return 0
+
+        target: float = self.count * percent / 100
+        cumulative: int = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                break
+
+        # 最后一个桶没有上边界，取最大值
+        if index >= len(self.bounds):
+            return self.max
+        return min(self.bounds[index], self.max)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """输出统计结果，单位微秒"""
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.get_percentile(50),
+            "p90": self.get_percentile(90),
+            "p99": self.get_percentile(99),
+            "bounds": self.bounds,
+            "counts": list(self.counts),
+        }
+
+
+class LatencyEntry:
+    """
+    单个统计维度的行情延迟和处理耗时直方图
+    """
+
+    __slots__ = ("feed", "process")
+
+    def __init__(self) -> None:
+        """构造函数"""
+        self.feed: LatencyHistogram = LatencyHistogram(FEED_BOUNDS)
+        self.process: LatencyHistogram = LatencyHistogram(PROCESS_BOUNDS)
+
+
+class LatencyMonitor:
+    """
+    行情延迟监控
+
+    每笔行情记录三个时间点：交易所时间（UpdateTime和UpdateMillisec）、
+    回调入口的接收时间，以及on_tick返回后的时间。接收时间减交易所时间
+    反映前置链路延迟和时钟偏差，on_tick返回时间减接收时间反映本地处理耗时，
+    分别按交易所和合约计入固定桶数的直方图。
+    """
+
+    def __init__(self) -> None:
+        """构造函数"""
+        # 接收时间按线程保存，多个行情前置的回调线程互不影响
+        self.local: local = local()
+
+        self.exchanges: Dict[Exchange, LatencyEntry] = {}
+        self.symbols: Dict[str, LatencyEntry] = {}
+
+    def on_receive(self) -> None:
+        """在回调入口记录接收时间"""
+        data: local = self.local
+        data.recv_ns = time_ns()
+        data.recv_mono = perf_counter_ns()
+
+    def record(self, symbol: str, exchange: Exchange, dt: datetime, recv_ns: int = 0) -> None:
+        """
+        在on_tick返回后记录延迟
+
+        recv_ns不为0时表示行情经过交接队列，使用写入队列时的接收时间
+        """
+        if recv_ns:
+            process_us: int = (time_ns() - recv_ns) // 1000
+        else:
+            data: local = self.local
+            recv_ns = getattr(data, "recv_ns", 0)
+            if not recv_ns:
+                return
+            process_us: int = (perf_counter_ns() - data.recv_mono) // 1000
+
+        feed_us: int = recv_ns // 1000 - int(dt.timestamp() * 1_000_000)
+
+        feed_index: int = bisect_right(FEED_BOUNDS, feed_us)
+        process_index: int = bisect_right(PROCESS_BOUNDS, process_us)
+
+        entry: LatencyEntry | None = self.symbols.get(symbol, None)
+        if not entry:
+            entry = LatencyEntry()
+            self.symbols[symbol] = entry
+        entry.feed.add(feed_index, feed_us)
+        entry.process.add(process_index, process_us)
+
+        entry = self.exchanges.get(exchange, None)
+        if not entry:
+            entry = LatencyEntry()
+            self.exchanges[exchange] = entry
+        entry.feed.add(feed_index, feed_us)
+        entry.process.add(process_index, process_us)
+
+    def get_statistics(self, symbol: str = "", exchange: Exchange | None = None) -> Dict[str, Dict[str, Any]]:
+        """
+        查询延迟统计
+
+        指定合约或交易所时返回单个维度的结果，否则返回所有交易所的结果
+        """
+        if symbol:
+            entries: Dict[str, LatencyEntry] = {symbol: self.symbols[symbol]} if symbol in self.symbols else {}
+        elif exchange:
+            entries = {exchange.value: self.exchanges[exchange]} if exchange in self.exchanges else {}
+        else:
+            entries = {exchange.value: entry for exchange, entry in list(self.exchanges.items())}
+
+        return {
+            key: {"feed": entry.feed.to_dict(), "process": entry.process.to_dict()}
+            for key, entry in entries.items()
+        }
+
+    def clear(self) -> None:
+        """清空统计数据"""
+        self.exchanges = {}
+        self.symbols = {}
@@ -0,0 +1,287 @@
+import os
+import socket
+from collections import deque
+from select import select
+from threading import Thread
+from time import time_ns
+from typing import Callable, Deque, Dict, List, Set, Tuple
+
+from .ctp_record import RECORD_SIZE, DepthSnapshot, pack_depth, unpack_depth_from
+
+
+# 订阅全部合约的通配符
+ALL_SYMBOLS: str = "*"
+
+# 客户端未换行的命令数据上限
+MAX_INBOX: int = 65536
+
+
+class PublisherClient:
+    """
+    行情发布的单个客户端连接
+    """
+
+    def __init__(self, sock: socket.socket) -> None:
+        """构造函数"""
+        self.sock: socket.socket = sock
+        self.fileno: int = sock.fileno()
+        self.symbols: Set[str] = set()
+        self.all: bool = False
+
+        self.inbox: bytes = b""
+        self.outbox: bytearray = bytearray()
+
+
+class TickPublisher:
+    """
+    Unix域套接字行情发布
+
+    行情线程只把深度行情打包为定长二进制记录放入队列，由发布线程按固定
+    间隔取出，按各客户端订阅的合约过滤后合并为一次写入。客户端发送
+    "SUB 合约1,合约2\\n"或"UNSUB 合约1\\n"修改订阅，"*"表示全部合约。
+    客户端接收过慢导致待发送数据超过上限时直接断开，不会阻塞行情线程。
+    待发布队列有长度上限，发布线程处理不及时时丢弃最早的行情并计数。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        write_log: Callable[[str], None],
+        interval: float = 0.001,
+        max_buffer: int = 4 * 1024 * 1024,
+        max_queue: int = 65536
+    ) -> None:
+        """构造函数"""
+        self.path: str = path
+        self.write_log: Callable[[str], None] = write_log
+        self.interval: float = interval
+        self.max_buffer: int = max_buffer
+
+        self.queue: Deque[Tuple[str, bytes]] = deque(maxlen=max_queue)
+        self.clients: Dict[int, PublisherClient] = {}
+        self.drops: int = 0
+        self.overflows: int = 0
+
+        self.server: socket.socket | None = None
+        self.active: bool = False
+        self.thread: Thread | None = None
+
+    def start(self) -> None:
+        """启动发布线程"""
+        if self.active:
+            return
+
+        # 清理上次异常退出残留的套接字文件
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.path)
+        self.server.listen()
+        self.server.setblocking(False)
+
+        self.active = True
+        self.thread = Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """停止发布线程"""
+        if not self.thread:
+            return
+
+        self.active = False
+        self.thread.join()
+        self.thread = None
+
+        for client in list(self.clients.values()):
+            self.remove_client(client)
+
+        self.server.close()
+        self.server = None
+        os.unlink(self.path)
+
+    def publish(self, data: object) -> None:
+        """在行情线程中发布深度行情"""
+        # 没有客户端或发布线程已退出时不做任何处理
+        if not self.clients or not self.active:
+            return
+
+        queue: Deque[Tuple[str, bytes]] = self.queue
+        if len(queue) == queue.maxlen:
+            self.overflows += 1
+        queue.append((data.InstrumentID, pack_depth(data, time_ns())))
+
+    def run(self) -> None:
+        """发布线程主循环"""
+        try:
+            self.process()
+        except Exception as e:
+            self.write_log(f"行情发布线程异常退出：{e}")
+        finally:
+            # 线程退出后停止接收新的行情
+            self.active = False
+            self.queue.clear()
+
+    def process(self) -> None:
+        """监听客户端并发送行情"""
+        while self.active:
+            sockets: list = [self.server] + [client.sock for client in self.clients.values()]
+            readable, _, _ = select(sockets, [], [], self.interval)
+
+            for sock in readable:
+                if sock is self.server:
+                    self.accept()
+                else:
+                    client: PublisherClient | None = self.clients.get(sock.fileno(), None)
+                    if not client:
+                        continue
+
+                    # 单个客户端出错时只断开该客户端
+                    try:
+                        self.receive(client)
+                    except Exception as e:
+                        self.write_log(f"行情发布客户端命令处理失败，已断开连接：{e}")
+                        self.remove_client(client)
+
+            self.send()
+
+    def accept(self) -> None:
+        """接受新的客户端连接"""
+        try:
+            sock, _ = self.server.accept()
+        except BlockingIOError:
+            return
+
+        sock.setblocking(False)
+        client: PublisherClient = PublisherClient(sock)
+        self.clients[client.fileno] = client
+
+    def receive(self, client: PublisherClient) -> None:
+        """处理客户端发送的订阅命令"""
+        try:
+            data: bytes = client.sock.recv(65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+
+        if not data:
+            self.remove_client(client)
+            return
+
+        client.inbox += data
+        *lines, client.inbox = client.inbox.split(b"\n")
+
+        if len(client.inbox) > MAX_INBOX:
+            self.write_log("行情发布客户端命令过长，已断开连接")
+            self.remove_client(client)
+            return
+
+        for line in lines:
+            try:
+                text: str = line.decode()
+            except UnicodeDecodeError:
+                self.write_log(f"行情发布客户端命令无法解析，已忽略：{line[:64]!r}")
+                continue
+
+            command, _, arg = text.strip().partition(" ")
+            symbols: List[str] = [s.strip() for s in arg.split(",") if s.strip()]
+
+            if command == "SUB":
+                if ALL_SYMBOLS in symbols:
+                    client.all = True
+                client.symbols.update(symbols)
+            elif command == "UNSUB":
+                if ALL_SYMBOLS in symbols:
+                    client.all = False
+                client.symbols.difference_update(symbols)
+
+    def send(self) -> None:
+        """取出队列中的行情，按客户端过滤后批量发送"""
+        queue: Deque[Tuple[str, bytes]] = self.queue
+        records: List[Tuple[str, bytes]] = [queue.popleft() for _ in range(len(queue))]
+
+        for client in list(self.clients.values()):
+            if records:
+                if client.all:
+                    client.outbox += b"".join([record for _, record in records])
+                elif client.symbols:
+                    symbols: Set[str] = client.symbols
+                    client.outbox += b"".join([record for symbol, record in records if symbol in symbols])
+
+            if not client.outbox:
+                continue
+
+            try:
+                sent: int = client.sock.send(client.outbox)
+                del client.outbox[:sent]
+            except BlockingIOError:
+                pass
+            except OSError:
+                self.remove_client(client)
+                continue
+
+            if len(client.outbox) > self.max_buffer:
+                self.drops += 1
+                self.write_log(f"行情发布客户端接收过慢，已断开连接，待发送{len(client.outbox)}字节")
+                self.remove_client(client)
+
+    def remove_client(self, client: PublisherClient) -> None:
+        """断开客户端连接"""
+        self.clients.pop(client.fileno, None)
+        client.sock.close()
+
+    def get_statistics(self) -> Dict[str, int]:
+        """查询发布统计"""
+        return {
+            "clients": len(self.clients),
+            "queued": len(self.queue),
+            "drops": self.drops,
+            "overflows": self.overflows,
+            "alive": int(self.active),
+        }
+
+
+class TickSubscriber:
+    """
+    Unix域套接字行情订阅
+
+    供其他进程使用，连接TickPublisher并接收订阅合约的深度行情。
+    """
+
+    def __init__(self, path: str) -> None:
+        """构造函数"""
+        self.sock: socket.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+        self.buffer: bytearray = bytearray()
+
+    def subscribe(self, symbols: List[str]) -> None:
+        """订阅合约，传入["*"]订阅全部合约"""
+        self.sock.sendall(f"SUB {','.join(symbols)}\n".encode())
+
+    def unsubscribe(self, symbols: List[str]) -> None:
+        """退订合约"""
+        self.sock.sendall(f"UNSUB {','.join(symbols)}\n".encode())
+
+    def read(self, timeout: float | None = None) -> List[DepthSnapshot]:
+        """读取已到达的行情，timeout为None时阻塞等待，为0时不等待"""
+        self.sock.settimeout(timeout)
+        try:
+            data: bytes = self.sock.recv(1024 * RECORD_SIZE)
+        except (BlockingIOError, TimeoutError):
+            return []
+
+        if not data:
+            raise ConnectionError("行情发布端已断开连接")
+
+        buffer: bytearray = self.buffer
+        buffer += data
+
+        count: int = len(buffer) // RECORD_SIZE
+        result: List[DepthSnapshot] = [unpack_depth_from(buffer, i * RECORD_SIZE) for i in range(count)]
+        del buffer[:count * RECORD_SIZE]
+        return result
+
+    def close(self) -> None:
+        """断开连接"""
+        self.sock.close()
@@ -0,0 +1,112 @@
+from collections import namedtuple
+from operator import attrgetter
+from struct import Struct
+from typing import Callable, List
+
+
+# 浮点数字段
+DEPTH_FLOAT_FIELDS: List[str] = [
+    "LastPrice",
+    "PreSettlementPrice",
+    "PreClosePrice",
+    "PreOpenInterest",
+    "OpenPrice",
+    "HighestPrice",
+    "LowestPrice",
+    "Turnover",
+    "OpenInterest",
+    "ClosePrice",
+    "SettlementPrice",
+    "UpperLimitPrice",
+    "LowerLimitPrice",
+    "AveragePrice",
+    "BidPrice1",
+    "BidPrice2",
+    "BidPrice3",
+    "BidPrice4",
+    "BidPrice5",
+    "AskPrice1",
+    "AskPrice2",
+    "AskPrice3",
+    "AskPrice4",
+    "AskPrice5",
+]
+
+# 整数字段
+DEPTH_INT_FIELDS: List[str] = [
+    "UpdateMillisec",
+    "Volume",
+    "BidVolume1",
+    "BidVolume2",
+    "BidVolume3",
+    "BidVolume4",
+    "BidVolume5",
+    "AskVolume1",
+    "AskVolume2",
+    "AskVolume3",
+    "AskVolume4",
+    "AskVolume5",
+]
+
+# 字符串字段
+DEPTH_STR_FIELDS: List[str] = [
+    "TradingDay",
+    "ActionDay",
+    "UpdateTime",
+    "InstrumentID",
+    "ExchangeID",
+]
+
+DEPTH_FIELDS: List[str] = DEPTH_FLOAT_FIELDS + DEPTH_INT_FIELDS + DEPTH_STR_FIELDS
+
+# 定长二进制记录：本地接收时间（纳秒） + 浮点数字段 + 整数字段 + 字符串字段，补齐到320字节
+DEPTH_STRUCT: Struct = Struct(
+    "<q"
+    + "d" * len(DEPTH_FLOAT_FIELDS)
+    + "i" * len(DEPTH_INT_FIELDS)
+    + "9s9s9s31s9s"
+    + "5x"
+)
+RECORD_SIZE: int = DEPTH_STRUCT.size
+
+get_numbers: Callable = attrgetter(*DEPTH_FLOAT_FIELDS, *DEPTH_INT_FIELDS)
+
+# 从记录中还原的深度行情快照，字段名与DepthMarketDataField保持一致
+DepthSnapshot = namedtuple("DepthSnapshot", ["recv_ns"] + DEPTH_FIELDS)
+
+STR_COUNT: int = len(DEPTH_STR_FIELDS)
+
+
+def pack_depth_into(buffer: bytearray, offset: int, data: object, recv_ns: int) -> None:
+    """将深度行情写入缓冲区的指定位置"""
+    DEPTH_STRUCT.pack_into(
+        buffer,
+        offset,
+        recv_ns,
+        *get_numbers(data),
+        data.TradingDay.encode(),
+        data.ActionDay.encode(),
+        data.UpdateTime.encode(),
+        data.InstrumentID.encode(),
+        data.ExchangeID.encode(),
+    )
+
+
+def pack_depth(data: object, recv_ns: int) -> bytes:
+    """将深度行情打包为一条记录"""
+    return DEPTH_STRUCT.pack(
+        recv_ns,
+        *get_numbers(data),
+        data.TradingDay.encode(),
+        data.ActionDay.encode(),
+        data.UpdateTime.encode(),
+        data.InstrumentID.encode(),
+        data.ExchangeID.encode(),
+    )
+
+
+def unpack_depth_from(buffer: bytes, offset: int) -> DepthSnapshot:
+    """从缓冲区的指定位置读取深度行情"""
+    values: tuple = DEPTH_STRUCT.unpack_from(buffer, offset)
+    strings: tuple = tuple(b.rstrip(b"\x00").decode() for b in values[-STR_COUNT:])
+    return DepthSnapshot._make(values[:-STR_COUNT] + strings)
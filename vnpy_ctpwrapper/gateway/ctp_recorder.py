@@ -0,0 +1,314 @@
+import re
+from mmap import mmap
+from pathlib import Path
+from struct import Struct
+from threading import Event, Lock, Thread
+from time import time_ns
+from typing import BinaryIO, Callable, Dict, List, Set, Tuple
+
+from .ctp_record import RECORD_SIZE, pack_depth, pack_depth_into
+
+
+# 文件头：标识、版本、记录长度、容量、已写入数量
+HEADER_STRUCT: Struct = Struct("<8sIIQQ")
+HEADER_SIZE: int = 64
+RECORD_MAGIC: bytes = b"CTPDEPTH"
+RECORD_VERSION: int = 1
+
+PRODUCT_PATTERN = re.compile(r"[A-Za-z]+")
+
+# 分段文件打开前每个分段暂存的记录数量上限
+MAX_PENDING: int = 65536
+
+
+class RecordSegment:
+    """
+    单个交易日、单个分段的内存映射记录文件
+    """
+
+    def __init__(self, path: Path, capacity: int) -> None:
+        """构造函数"""
+        self.path: Path = path
+        self.capacity: int = capacity
+        self.count: int = 0
+        self.flushed: int = 0
+        self.overruns: int = 0
+
+        # 同一交易日内重启时，从已有文件末尾继续追加
+        if path.exists():
+            self.file: BinaryIO = open(path, "r+b")
+            header: bytes = self.file.read(HEADER_STRUCT.size)
+            magic, _, record_size, capacity, count = HEADER_STRUCT.unpack(header)
+            if magic != RECORD_MAGIC or record_size != RECORD_SIZE:
+                self.file.close()
+                raise ValueError(f"行情记录文件格式不匹配：{path}")
+
+            self.capacity = capacity
+            self.count = self.flushed = count
+        else:
+            self.file: BinaryIO = open(path, "w+b")
+            self.file.truncate(HEADER_SIZE + capacity * RECORD_SIZE)
+
+        self.mm: mmap = mmap(self.file.fileno(), HEADER_SIZE + self.capacity * RECORD_SIZE)
+        self.write_header()
+
+    def write(self, data: object, recv_ns: int) -> bool:
+        """写入一条记录，空间不足时返回False"""
+        if self.count >= self.capacity:
+            self.overruns += 1
+            return False
+
+        pack_depth_into(self.mm, HEADER_SIZE + self.count * RECORD_SIZE, data, recv_ns)
+        self.count += 1
+        return True
+
+    def write_records(self, records: List[bytes]) -> int:
+        """写入已打包的记录，返回空间不足未能写入的数量"""
+        writable: int = min(len(records), self.capacity - self.count)
+
+        offset: int = HEADER_SIZE + self.count * RECORD_SIZE
+        data: bytes = b"".join(records[:writable])
+        self.mm[offset:offset + len(data)] = data
+        self.count += writable
+
+        overruns: int = len(records) - writable
+        self.overruns += overruns
+        return overruns
+
+    def write_header(self) -> None:
+        """更新文件头"""
+        HEADER_STRUCT.pack_into(
+            self.mm, 0, RECORD_MAGIC, RECORD_VERSION, RECORD_SIZE, self.capacity, self.count
+        )
+
+    def flush(self) -> None:
+        """将已写入的记录刷新到磁盘"""
+        count: int = self.count
+        if count == self.flushed:
+            return
+
+        self.write_header()
+        self.mm.flush()
+        self.flushed = count
+
+    def close(self) -> None:
+        """关闭文件"""
+        self.flush()
+        self.mm.close()
+        self.file.close()
+
+
+class TickRecorder:
+    """
+    深度行情记录器
+
+    按交易日建立目录，每个交易所（或品种）一个预分配的内存映射文件。
+    行情回调线程中只做内存拷贝，文件的创建、打开和刷盘都由后台线程完成：
+    分段文件打开前的记录先暂存在内存中，打开后由后台线程补写。
+    文件空间写满后丢弃新数据并计入溢出数量；文件打开失败的分段当天停止记录，
+    计入失败数量，不会阻塞回调线程或在回调中抛出异常。
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        capacity: int = 2_000_000,
+        by_product: bool = False,
+        interval: float = 1.0,
+        write_log: Callable[[str], None] | None = None
+    ) -> None:
+        """构造函数"""
+        self.path: Path = path
+        self.capacity: int = capacity
+        self.by_product: bool = by_product
+        self.interval: float = interval
+        self.write_log: Callable[[str], None] | None = write_log
+
+        self.trading_day: str = ""
+        self.segments: Dict[str, RecordSegment] = {}
+        self.retired: List[RecordSegment] = []
+        self.products: Dict[str, str] = {}
+        self.overruns: int = 0
+
+        # 等待后台线程打开的分段，键为（交易日，分段）
+        self.pending: Dict[Tuple[str, str], List[bytes]] = {}
+        self.disabled: Set[str] = set()
+        self.pending_overruns: int = 0      # 只由后台线程修改
+        self.open_failures: int = 0
+        self.failed_records: int = 0
+
+        self.lock: Lock = Lock()
+        self.event: Event = Event()
+        self.thread: Thread = Thread(target=self.run, daemon=True)
+        self.active: bool = False
+
+    def start(self) -> None:
+        """启动后台刷盘线程"""
+        if self.active:
+            return
+        self.active = True
+        self.thread.start()
+
+    def stop(self) -> None:
+        """停止并关闭所有文件"""
+        if not self.active:
+            return
+        self.active = False
+        self.event.set()
+        self.thread.join()
+
+        # 写入停止前仍在等待的记录
+        self.open_pending()
+
+        # 持有锁关闭文件，回调线程中正在进行的写入完成后才会关闭，
+        # 之后的写入看到停止状态直接返回
+        with self.lock:
+            segments: List[RecordSegment] = self.retired + list(self.segments.values())
+            self.retired = []
+            self.segments = {}
+
+            for segment in segments:
+                segment.close()
+
+    def record(self, data: object, exchange: str) -> None:
+        """记录一条深度行情"""
+        recv_ns: int = time_ns()
+
+        trading_day: str = data.TradingDay
+        if trading_day != self.trading_day:
+            # 切换交易日后收到的上一交易日行情直接丢弃
+            if trading_day < self.trading_day:
+                self.overruns += 1
+                return
+            self.switch_day(trading_day)
+
+        if self.by_product:
+            symbol: str = data.InstrumentID
+            key: str | None = self.products.get(symbol, None)
+            if not key:
+                match = PRODUCT_PATTERN.match(symbol)
+                key = match.group() if match else symbol
+                self.products[symbol] = key
+        else:
+            key: str = exchange
+
+        with self.lock:
+            if not self.active:
+                return
+
+            segment: RecordSegment | None = self.segments.get(key, None)
+            if segment:
+                if not segment.write(data, recv_ns):
+                    self.overruns += 1
+                return
+
+        self.defer(key, pack_depth(data, recv_ns))
+
+    def defer(self, key: str, record: bytes) -> None:
+        """分段文件尚未打开时暂存记录，并通知后台线程打开"""
+        with self.lock:
+            if not self.active:
+                return
+
+            # 加锁后再次检查，后台线程可能刚刚完成打开
+            segment: RecordSegment | None = self.segments.get(key, None)
+            if segment:
+                if not segment.write_records([record]):
+                    return
+                self.overruns += 1
+                return
+
+            if key in self.disabled:
+                self.failed_records += 1
+                return
+
+            records: List[bytes] = self.pending.setdefault((self.trading_day, key), [])
+            if len(records) >= MAX_PENDING:
+                self.overruns += 1
+                return
+            records.append(record)
+
+        self.event.set()
+
+    def switch_day(self, trading_day: str) -> None:
+        """切换交易日，旧文件交由后台线程关闭"""
+        with self.lock:
+            self.retired.extend(self.segments.values())
+            self.segments = {}
+            self.disabled = set()
+            self.trading_day = trading_day
+
+    def open_segment(self, trading_day: str, key: str) -> RecordSegment:
+        """在后台线程中打开交易日的分段文件"""
+        folder: Path = self.path.joinpath(trading_day)
+        folder.mkdir(parents=True, exist_ok=True)
+
+        return RecordSegment(folder.joinpath(f"{key}.dat"), self.capacity)
+
+    def open_pending(self) -> None:
+        """打开等待中的分段文件，并写入暂存的记录"""
+        with self.lock:
+            keys: List[Tuple[str, str]] = list(self.pending)
+
+        for trading_day, key in keys:
+            try:
+                segment: RecordSegment | None = self.open_segment(trading_day, key)
+            except Exception as e:
+                segment = None
+                self.open_failures += 1
+                if self.write_log:
+                    self.write_log(f"行情记录文件打开失败，{trading_day} {key}停止记录：{e}")
+
+            with self.lock:
+                records: List[bytes] = self.pending.pop((trading_day, key))
+
+                if not segment:
+                    self.failed_records += len(records)
+                    if trading_day == self.trading_day:
+                        self.disabled.add(key)
+                    continue
+
+                self.pending_overruns += segment.write_records(records)
+
+                # 打开期间已经切换交易日时，直接交由后续刷盘关闭
+                if trading_day == self.trading_day:
+                    self.segments[key] = segment
+                else:
+                    self.retired.append(segment)
+
+    def run(self) -> None:
+        """后台打开分段文件并定时刷盘"""
+        while self.active:
+            self.event.wait(self.interval)
+            self.event.clear()
+
+            self.open_pending()
+            self.flush()
+
+    def flush(self) -> None:
+        """刷新所有文件"""
+        with self.lock:
+            retired: List[RecordSegment] = self.retired
+            self.retired = []
+
+        for segment in retired:
+            segment.close()
+
+        for segment in list(self.segments.values()):
+            segment.flush()
+
+    def get_overrun_count(self) -> int:
+        """查询溢出丢弃的记录数量"""
+        return self.overruns + self.pending_overruns
+
+    def get_failure_count(self) -> Dict[str, int]:
+        """查询文件打开失败的次数和因此丢弃的记录数量"""
+        return {
+            "open_failures": self.open_failures,
+            "failed_records": self.failed_records,
+            "disabled": len(self.disabled),
+        }
+
+    def get_record_counts(self) -> Dict[str, int]:
+        """查询当前交易日各分段已写入的记录数量"""
+        return {key: segment.count for key, segment in list(self.segments.items())}
@@ -0,0 +1,69 @@
+from threading import Lock
+from typing import Dict, Iterable
+
+from vnpy.trader.object import ContractData
+
+from .ctp_index import ContractIndex
+
+
+class ContractRegistry:
+    """
+    读多写少的合约注册表
+
+    contracts字典发布后不再修改，更新时复制一份修改后整体替换引用，
+    行情和交易回调线程直接读取当前引用，无需加锁，也不会被其他会话的
+    更新阻塞。同一进程内的多个网关可以引用同一个注册表，合约数据只需
+    加载一次。
+    """
+
+    def __init__(self) -> None:
+        """构造函数"""
+        self.lock: Lock = Lock()
+
+        self.contracts: Dict[str, ContractData] = {}
+        self.index: ContractIndex = ContractIndex()
+
+        # 已完成全量加载的交易日
+        self.trading_day: str = ""
+
+    def get(self, symbol: str) -> ContractData | None:
+        """查询合约"""
+        return self.contracts.get(symbol, None)
+
+    def update(self, contracts: Dict[str, ContractData]) -> None:
+        """批量添加或更新合约"""
+        if not contracts:
+            return
+
+        with self.lock:
+            new_contracts: Dict[str, ContractData] = dict(self.contracts)
+            new_contracts.update(contracts)
+            self.contracts = new_contracts
+
+    def remove(self, symbols: Iterable[str]) -> None:
+        """批量移除合约"""
+        with self.lock:
+            new_contracts: Dict[str, ContractData] = dict(self.contracts)
+            for symbol in symbols:
+                new_contracts.pop(symbol, None)
+                self.index.remove(symbol)
+            self.contracts = new_contracts
+
+    def set_loaded(self, trading_day: str) -> None:
+        """记录已完成全量加载的交易日"""
+        self.trading_day = trading_day
+
+    def is_loaded(self, trading_day: str) -> bool:
+        """查询交易日的合约是否已经全量加载"""
+        return bool(trading_day) and self.trading_day == trading_day
+
+    def clear(self) -> None:
+        """清空注册表"""
+        with self.lock:
+            self.contracts = {}
+            self.index.clear()
+            self.trading_day = ""
+
+
+# 通过enable_shared_contracts在进程内网关之间共享的注册表
+shared_registry: ContractRegistry = ContractRegistry()
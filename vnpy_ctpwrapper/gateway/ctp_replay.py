@@ -0,0 +1,127 @@
+from heapq import merge
+from mmap import mmap, ACCESS_READ
+from operator import attrgetter
+from pathlib import Path
+from threading import Thread
+from time import gmtime, perf_counter, sleep, strftime
+from typing import Iterable, Iterator, List
+
+from .ctp_gateway import CtpMdApi
+from .ctp_record import RECORD_SIZE, DepthSnapshot, unpack_depth_from
+from .ctp_recorder import HEADER_SIZE, HEADER_STRUCT, RECORD_MAGIC
+
+
+# 中国时区相对UTC的偏移（纳秒），用于从接收时间推算本地日期
+CHINA_OFFSET_NS: int = 8 * 3600 * 1_000_000_000
+DAY_NS: int = 86400 * 1_000_000_000
+
+
+def iter_segment(path: Path) -> Iterator[DepthSnapshot]:
+    """按顺序读取记录文件中的深度行情"""
+    with open(path, "rb") as f:
+        header: bytes = f.read(HEADER_STRUCT.size)
+        magic, _, record_size, _, count = HEADER_STRUCT.unpack(header)
+        if magic != RECORD_MAGIC or record_size != RECORD_SIZE:
+            raise ValueError(f"行情记录文件格式不匹配：{path}")
+
+        if not count:
+            return
+
+        with mmap(f.fileno(), 0, access=ACCESS_READ) as mm:
+            for i in range(count):
+                yield unpack_depth_from(mm, HEADER_SIZE + i * RECORD_SIZE)
+
+
+def iter_records(paths: Iterable[Path]) -> Iterator[DepthSnapshot]:
+    """读取多个记录文件（或交易日目录），按本地接收时间归并"""
+    files: List[Path] = []
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            files.extend(sorted(path.glob("*.dat")))
+        else:
+            files.append(path)
+
+    return merge(*[iter_segment(f) for f in files], key=attrgetter("recv_ns"))
+
+
+class TickReplayer:
+    """
+    深度行情回放器
+
+    读取TickRecorder记录的文件，按本地接收时间顺序调用
+    CtpMdApi.OnRtnDepthMarketData，完整复现合约查找、TickData构造
+    和推送的处理流程。回放前需要先准备好合约注册表中的合约数据。
+
+    speed为0时尽快回放，为1时按记录时的实际间隔回放，为N时按N倍速回放。
+    """
+
+    def __init__(self, md_api: CtpMdApi, paths: Iterable[Path], speed: float = 0) -> None:
+        """构造函数"""
+        self.md_api: CtpMdApi = md_api
+        self.paths: List[Path] = list(paths)
+        self.speed: float = speed
+
+        self.count: int = 0
+        self.elapsed: float = 0
+        self.active: bool = False
+        self.thread: Thread | None = None
+
+    def run(self) -> int:
+        """执行回放，返回回放的行情数量"""
+        self.active = True
+        self.count = 0
+
+        md_api: CtpMdApi = self.md_api
+        speed: float = self.speed
+
+        start_time: float = perf_counter()
+        first_ns: int = 0
+        day: int = 0
+
+        for snapshot in iter_records(self.paths):
+            if not self.active:
+                break
+
+            recv_ns: int = snapshot.recv_ns
+
+            # 大商所行情依赖本地日期，按记录时的本地日期回放
+            snapshot_day: int = (recv_ns + CHINA_OFFSET_NS) // DAY_NS
+            if snapshot_day != day:
+                day = snapshot_day
+                md_api.current_date = self.get_local_date(recv_ns)
+
+            if speed:
+                if not first_ns:
+                    first_ns = recv_ns
+
+                delay: float = (recv_ns - first_ns) / 1e9 / speed - (perf_counter() - start_time)
+                if delay > 0:
+                    sleep(delay)
+
+            md_api.OnRtnDepthMarketData(snapshot)
+            self.count += 1
+
+        self.elapsed = perf_counter() - start_time
+        self.active = False
+        return self.count
+
+    def start(self) -> None:
+        """在后台线程中回放"""
+        if self.active:
+            return
+        self.active = True
+        self.thread = Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """停止回放"""
+        self.active = False
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def get_local_date(self, recv_ns: int) -> str:
+        """由接收时间计算本地日期"""
+        seconds: int = (recv_ns + CHINA_OFFSET_NS) // 1_000_000_000
+        return strftime("%Y%m%d", gmtime(seconds))
@@ -0,0 +1,146 @@
+from multiprocessing.shared_memory import SharedMemory
+from struct import Struct
+from time import time_ns
+from typing import Dict, List
+
+from .ctp_board import attach_shared_memory, create_shared_memory, remove_shared_memory
+from .ctp_record import RECORD_SIZE, DepthSnapshot, pack_depth_into, unpack_depth_from
+from .ctp_recorder import HEADER_SIZE, HEADER_STRUCT
+
+
+RING_MAGIC: bytes = b"CTPRING\x00"
+RING_VERSION: int = 1
+
+# 文件头中已写入数量字段的偏移，每笔行情只更新这一个字段
+HEAD_STRUCT: Struct = Struct("<Q")
+HEAD_OFFSET: int = HEADER_STRUCT.size - HEAD_STRUCT.size
+
+# 每个槽位：序号标记 + 深度行情记录，标记为记录序号加一，写入中为0
+STAMP_STRUCT: Struct = Struct("<Q")
+SLOT_SIZE: int = STAMP_STRUCT.size + RECORD_SIZE
+
+
+class TickRing:
+    """
+    共享内存逐笔行情环形队列
+
+    单个写入方按顺序写入每一笔深度行情，多个读取进程各自维护读取位置。
+    写入槽位时先将标记清零，写完记录后再将标记设为记录序号加一，
+    最后更新文件头中的已写入数量。写入方从不等待读取方，读取过慢的
+    一方通过标记不一致发现自己被覆盖。同名队列的写入方仍在运行时创建失败。
+    """
+
+    def __init__(self, name: str, capacity: int = 65536) -> None:
+        """构造函数，容量会向上取整到2的幂"""
+        size: int = 1
+        while size < capacity:
+            size <<= 1
+
+        self.name: str = name
+        self.capacity: int = size
+        self.mask: int = size - 1
+        self.head: int = 0
+
+        self.shm: SharedMemory = create_shared_memory(name, HEADER_SIZE + size * SLOT_SIZE)
+        self.buffer: memoryview = self.shm.buf
+
+        HEADER_STRUCT.pack_into(
+            self.buffer, 0, RING_MAGIC, RING_VERSION, SLOT_SIZE, self.capacity, 0
+        )
+
+    def put(self, data: object) -> None:
+        """写入一笔深度行情"""
+        head: int = self.head
+        offset: int = HEADER_SIZE + (head & self.mask) * SLOT_SIZE
+
+        STAMP_STRUCT.pack_into(self.buffer, offset, 0)
+        pack_depth_into(self.buffer, offset + STAMP_STRUCT.size, data, time_ns())
+        STAMP_STRUCT.pack_into(self.buffer, offset, head + 1)
+
+        self.head = head + 1
+        HEAD_STRUCT.pack_into(self.buffer, HEAD_OFFSET, self.head)
+
+    def get_statistics(self) -> Dict[str, int]:
+        """查询写入统计"""
+        return {
+            "capacity": self.capacity,
+            "written": self.head,
+        }
+
+    def close(self) -> None:
+        """关闭并删除共享内存"""
+        self.buffer.release()
+        remove_shared_memory(self.shm)
+
+
+class TickRingReader:
+    """
+    共享内存逐笔行情环形队列读取
+
+    供其他进程使用，每个读取方独立维护读取位置。被写入方覆盖时
+    丢失的数量计入overruns，并跳到队列中较新的位置继续读取。
+    """
+
+    def __init__(self, name: str, from_start: bool = False) -> None:
+        """构造函数，from_start为True时从队列中最早的记录开始读取"""
+        self.shm: SharedMemory = attach_shared_memory(name)
+        self.buffer: memoryview = self.shm.buf
+
+        magic, _, slot_size, capacity, head = HEADER_STRUCT.unpack_from(self.buffer, 0)
+        if magic != RING_MAGIC or slot_size != SLOT_SIZE:
+            self.close()
+            raise ValueError(f"行情环形队列格式不匹配：{name}")
+
+        self.capacity: int = capacity
+        self.mask: int = capacity - 1
+
+        if from_start:
+            self.cursor: int = max(head - capacity, 0)
+        else:
+            self.cursor: int = head
+
+        self.overruns: int = 0
+
+    def get_head(self) -> int:
+        """查询写入方的已写入数量"""
+        return HEAD_STRUCT.unpack_from(self.buffer, HEAD_OFFSET)[0]
+
+    def skip(self, head: int) -> None:
+        """被覆盖后跳到队列中间位置，留出余量避免再次被覆盖"""
+        cursor: int = head - self.capacity // 2
+        self.overruns += cursor - self.cursor
+        self.cursor = cursor
+
+    def read(self, max_count: int = 1024) -> List[DepthSnapshot]:
+        """读取新到达的行情，最多返回max_count笔"""
+        result: List[DepthSnapshot] = []
+
+        head: int = self.get_head()
+        if head - self.cursor > self.capacity:
+            self.skip(head)
+
+        end: int = min(head, self.cursor + max_count)
+        while self.cursor < end:
+            cursor: int = self.cursor
+            offset: int = HEADER_SIZE + (cursor & self.mask) * SLOT_SIZE
+
+            snapshot: DepthSnapshot = unpack_depth_from(self.buffer, offset + STAMP_STRUCT.size)
+
+            # 读取完成后检查标记，不一致说明读取期间槽位已被覆盖
+            if STAMP_STRUCT.unpack_from(self.buffer, offset)[0] != cursor + 1:
+                self.skip(self.get_head())
+                break
+
+            result.append(snapshot)
+            self.cursor = cursor + 1
+
+        return result
+
+    def get_lag(self) -> int:
+        """查询尚未读取的数量"""
+        return self.get_head() - self.cursor
+
+    def close(self) -> None:
+        """断开共享内存"""
+        self.buffer.release()
+        self.shm.close()
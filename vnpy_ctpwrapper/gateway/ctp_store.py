@@ -0,0 +1,112 @@
+from typing import Dict
+
+import numpy as np
+
+from vnpy.trader.object import TickData
+
+
+# Tick数据列定义
+TICK_DTYPE: np.dtype = np.dtype([
+    ("datetime", "datetime64[ms]"),
+    ("last_price", "f8"),
+    ("open_price", "f8"),
+    ("high_price", "f8"),
+    ("low_price", "f8"),
+    ("volume", "f8"),
+    ("turnover", "f8"),
+    ("open_interest", "f8"),
+    ("bid_price", "f8", (5,)),
+    ("ask_price", "f8", (5,)),
+    ("bid_volume", "f8", (5,)),
+    ("ask_volume", "f8", (5,)),
+])
+
+
+class TickBuffer:
+    """
+    单合约Tick环形缓存
+
+    底层数组长度为容量的两倍，顺序写入到末尾后将最近的一个容量的
+    数据整体搬回头部，从而保证最近N条数据在内存中始终连续，
+    可以直接返回切片视图而无需拷贝。
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """构造函数"""
+        self.capacity: int = capacity
+        self.data: np.ndarray = np.zeros(capacity * 2, dtype=TICK_DTYPE)
+
+        self.pos: int = 0
+        self.count: int = 0
+
+    def append(self, row: tuple) -> None:
+        """写入一条数据"""
+        if self.pos == len(self.data):
+            self.data[:self.capacity] = self.data[self.capacity:]
+            self.pos = self.capacity
+
+        self.data[self.pos] = row
+        self.pos += 1
+        self.count += 1
+
+    def view(self, n: int) -> np.ndarray:
+        """获取最近n条数据的只读视图"""
+        n = max(min(n, self.count, self.capacity), 0)
+
+        array: np.ndarray = self.data[self.pos - n:self.pos]
+        array.flags.writeable = False
+        return array
+
+
+class TickStore:
+    """
+    按合约保存最近Tick数据的列式缓存
+
+    返回的视图与缓存共享内存，会被后续写入覆盖，
+    需要长期持有时请自行调用copy()。
+    """
+
+    def __init__(self, capacity: int = 2048) -> None:
+        """构造函数"""
+        self.capacity: int = capacity
+        self.buffers: Dict[str, TickBuffer] = {}
+
+    def update_tick(self, tick: TickData) -> None:
+        """写入Tick数据"""
+        buffer: TickBuffer | None = self.buffers.get(tick.symbol, None)
+        if not buffer:
+            buffer = TickBuffer(self.capacity)
+            self.buffers[tick.symbol] = buffer
+
+        buffer.append((
+            round(tick.datetime.timestamp() * 1000),
+            tick.last_price,
+            tick.open_price,
+            tick.high_price,
+            tick.low_price,
+            tick.volume,
+            tick.turnover,
+            tick.open_interest,
+            (tick.bid_price_1, tick.bid_price_2, tick.bid_price_3, tick.bid_price_4, tick.bid_price_5),
+            (tick.ask_price_1, tick.ask_price_2, tick.ask_price_3, tick.ask_price_4, tick.ask_price_5),
+            (tick.bid_volume_1, tick.bid_volume_2, tick.bid_volume_3, tick.bid_volume_4, tick.bid_volume_5),
+            (tick.ask_volume_1, tick.ask_volume_2, tick.ask_volume_3, tick.ask_volume_4, tick.ask_volume_5),
+        ))
+
+    def get_ticks(self, symbol: str, n: int) -> np.ndarray | None:
+        """获取合约最近n条Tick数据的只读视图"""
+        buffer: TickBuffer | None = self.buffers.get(symbol, None)
+        if not buffer:
+            return None
+        return buffer.view(n)
+
+    def get_count(self, symbol: str) -> int:
+        """获取合约累计写入的Tick数量"""
+        buffer: TickBuffer | None = self.buffers.get(symbol, None)
+        if not buffer:
+            return 0
+        return buffer.count
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self.buffers.clear()
@@ -0,0 +1,265 @@
+from threading import Event, Lock, Thread
+from time import monotonic, sleep
+from typing import Callable, Dict, List, Set
+
+
+class SubscriptionPipeline:
+    """
+    行情订阅流水线
+
+    将订阅请求合并为固定大小的批次，按间隔依次发送，避免一次性
+    订阅大量合约时触发前置流控。逐个合约跟踪订阅回报，失败或超时
+    未收到回报的合约重新排队，超过重试次数后记录为失败。
+    退订请求同样分批发送，且优先于订阅请求。
+    """
+
+    def __init__(
+        self,
+        send: Callable[[List[str]], int],
+        send_unsubscribe: Callable[[List[str]], int],
+        write_log: Callable[[str], None],
+        chunk_size: int = 500,
+        interval: float = 0.05,
+        ack_timeout: float = 5,
+        max_retries: int = 3
+    ) -> None:
+        """构造函数"""
+        self.send: Callable[[List[str]], int] = send
+        self.send_unsubscribe: Callable[[List[str]], int] = send_unsubscribe
+        self.write_log: Callable[[str], None] = write_log
+
+        self.chunk_size: int = chunk_size
+        self.interval: float = interval
+        self.ack_timeout: float = ack_timeout
+        self.max_retries: int = max_retries
+
+        self.lock: Lock = Lock()
+        self.pending: Dict[str, None] = {}          # 等待发送（按插入顺序）
+        self.inflight: Dict[str, float] = {}        # 已发送，等待回报
+        self.acked: Set[str] = set()                # 订阅成功
+        self.failed: Set[str] = set()               # 重试后仍失败
+        self.attempts: Dict[str, int] = {}
+        self.unsubscribe_pending: Dict[str, None] = {}
+
+        self.event: Event = Event()
+        self.active: bool = False
+        self.thread: Thread | None = None
+
+    def start(self) -> None:
+        """启动发送线程"""
+        if self.active:
+            return
+        self.active = True
+        self.thread = Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """停止发送线程"""
+        if not self.active:
+            return
+        self.active = False
+        self.event.set()
+        self.thread.join()
+        self.thread = None
+
+    def add(self, symbols: List[str]) -> None:
+        """添加待订阅合约"""
+        with self.lock:
+            for symbol in symbols:
+                # 尚未发出的退订直接取消，重新订阅一次确保状态一致
+                self.unsubscribe_pending.pop(symbol, None)
+
+                if symbol in self.acked or symbol in self.inflight:
+                    continue
+                self.pending[symbol] = None
+                self.failed.discard(symbol)
+                self.attempts.pop(symbol, None)
+
+        self.start()
+        self.event.set()
+
+    def remove(self, symbols: List[str]) -> None:
+        """添加待退订合约"""
+        with self.lock:
+            for symbol in symbols:
+                self.attempts.pop(symbol, None)
+                self.failed.discard(symbol)
+
+                # 尚未发出的订阅直接取消
+                if symbol in self.pending:
+                    self.pending.pop(symbol)
+                    continue
+
+                self.inflight.pop(symbol, None)
+                self.acked.discard(symbol)
+                self.unsubscribe_pending[symbol] = None
+
+        self.start()
+        self.event.set()
+
+    def reset(self) -> None:
+        """清空所有状态，断线后调用"""
+        with self.lock:
+            self.unsubscribe_pending.clear()
+            self.pending.clear()
+            self.inflight.clear()
+            self.acked.clear()
+            self.failed.clear()
+            self.attempts.clear()
+
+    def on_ack(self, symbol: str, success: bool) -> None:
+        """收到订阅回报"""
+        with self.lock:
+            if self.inflight.pop(symbol, None) is None:
+                return
+
+            if success:
+                self.acked.add(symbol)
+                self.attempts.pop(symbol, None)
+                return
+
+            self.retry(symbol)
+
+        self.event.set()
+
+    def retry(self, symbol: str) -> None:
+        """重新排队，调用时需持有锁"""
+        attempts: int = self.attempts.get(symbol, 0) + 1
+        if attempts > self.max_retries:
+            self.attempts.pop(symbol, None)
+            self.failed.add(symbol)
+            self.write_log(f"行情订阅重试{self.max_retries}次后仍失败：{symbol}")
+        else:
+            self.attempts[symbol] = attempts
+            self.pending[symbol] = None
+
+    def run(self) -> None:
+        """发送线程主循环"""
+        while self.active:
+            self.event.clear()
+
+            chunk: List[str] = self.next_unsubscribe_chunk()
+            if chunk:
+                n: int = self.send_unsubscribe(chunk)
+
+                # 发送失败（如流控）则放回队列头部
+                if n:
+                    with self.lock:
+                        self.unsubscribe_pending = dict.fromkeys(chunk) | self.unsubscribe_pending
+
+                # 两个批次之间固定间隔
+                sleep(self.interval)
+                continue
+
+            chunk = self.next_chunk()
+            if chunk:
+                n: int = self.send(chunk)
+
+                if n:
+                    with self.lock:
+                        for symbol in chunk:
+                            self.inflight.pop(symbol, None)
+                        self.pending = dict.fromkeys(chunk) | self.pending
+
+                sleep(self.interval)
+            elif self.inflight:
+                # 仍有等待回报的合约，定时检查超时
+                self.event.wait(self.interval)
+            else:
+                self.event.wait()
+
+    def next_unsubscribe_chunk(self) -> List[str]:
+        """取出下一批待退订的合约"""
+        with self.lock:
+            chunk: List[str] = []
+            for symbol in self.unsubscribe_pending:
+                chunk.append(symbol)
+                if len(chunk) >= self.chunk_size:
+                    break
+
+            for symbol in chunk:
+                self.unsubscribe_pending.pop(symbol)
+
+        return chunk
+
+    def next_chunk(self) -> List[str]:
+        """处理超时并取出下一批待订阅的合约"""
+        now: float = monotonic()
+
+        with self.lock:
+            for symbol, sent_time in list(self.inflight.items()):
+                if now - sent_time > self.ack_timeout:
+                    self.inflight.pop(symbol)
+                    self.retry(symbol)
+
+            chunk: List[str] = []
+            for symbol in self.pending:
+                chunk.append(symbol)
+                if len(chunk) >= self.chunk_size:
+                    break
+
+            for symbol in chunk:
+                self.pending.pop(symbol)
+                self.inflight[symbol] = now
+
+        return chunk
+
+    def get_status(self) -> Dict[str, int]:
+        """查询订阅状态统计"""
+        with self.lock:
+            return {
+                "pending": len(self.pending),
+                "inflight": len(self.inflight),
+                "acked": len(self.acked),
+                "failed": len(self.failed),
+                "unsubscribing": len(self.unsubscribe_pending),
+            }
+
+    def get_failed_symbols(self) -> List[str]:
+        """查询订阅失败的合约"""
+        with self.lock:
+            return sorted(self.failed)
+
+
+class SubscriptionRegistry:
+    """
+    引用计数的订阅登记表
+
+    多个策略可以订阅同一合约，只有第一次订阅时才真正发出订阅请求，
+    全部释放后才发出退订请求。
+    """
+
+    def __init__(self) -> None:
+        """构造函数"""
+        self.lock: Lock = Lock()
+        self.counts: Dict[str, int] = {}
+
+    def acquire(self, symbol: str) -> bool:
+        """增加引用，首次订阅时返回True"""
+        with self.lock:
+            count: int = self.counts.get(symbol, 0) + 1
+            self.counts[symbol] = count
+            return count == 1
+
+    def release(self, symbol: str) -> bool:
+        """减少引用，引用归零时返回True"""
+        with self.lock:
+            count: int = self.counts.get(symbol, 0)
+            if not count:
+                return False
+
+            if count == 1:
+                self.counts.pop(symbol)
+                return True
+
+            self.counts[symbol] = count - 1
+            return False
+
+    def get_count(self, symbol: str) -> int:
+        """查询合约的引用数量"""
+        return self.counts.get(symbol, 0)
+
+    def get_symbols(self) -> List[str]:
+        """查询所有已订阅的合约"""
+        with self.lock:
+            return list(self.counts)